@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Betting Slip Rendering Benchmark
+
+Times the slip renderers in print_slip.py on synthetic slips from 1 to 500
+bets, records peak memory with tracemalloc and compares the results with a
+stored baseline so render-time regressions are caught before they reach
+the shops. Printing goes to the null backend, so this runs on Linux too.
+
+Cold start is tracked as well: the CLI is run the way PHP runs it, once per
+output format, under python -X importtime, recording wall time, import time
+and which heavy dependencies each format pulls in.
+
+Usage:
+    python benchmark_print_slip.py                     # compare with baseline
+    python benchmark_print_slip.py --save-baseline     # record a new baseline
+    python benchmark_print_slip.py --require-baseline  # CI: fail when the baseline is missing
+    python benchmark_print_slip.py --bets 1 50 --repeat 5 --output results.json
+    python benchmark_print_slip.py --import-profile    # slowest imports per format
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from print_slip import BettingSlipPrinter, EscPosRenderer, OUTPUT_FORMATS
+
+PRINT_SLIP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'print_slip.py')
+# Dependencies whose presence in a cold start is worth reporting
+TRACKED_MODULES = ('reportlab', 'win32print', 'win32api', 'sqlite3', 'http.server')
+
+DEFAULT_BET_COUNTS = [1, 10, 50, 100, 500]
+DEFAULT_REPEAT = 7
+DEFAULT_TOLERANCE = 0.25
+# Ignore slowdowns smaller than this; sub-millisecond cases are mostly timer noise
+MIN_TIME_DELTA_MS = 0.5
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'print_slip_benchmark_baseline.json')
+
+BET_TYPES = [
+    ('straight', 'Straight Up on {n}', '35:1', 36),
+    ('split', 'Split {n}/{m}', '17:1', 18),
+    ('corner', 'Corner {n}-{m}', '8:1', 9),
+    ('red', 'Red', '1:1', 2),
+    ('dozen', '1st Dozen', '2:1', 3),
+]
+
+
+def make_slip(bet_count):
+    """Synthetic slip with a deterministic mix of bet types"""
+    bets = []
+    total = 0
+    for i in range(bet_count):
+        bet_type, description, odds, multiplier = BET_TYPES[i % len(BET_TYPES)]
+        amount = 5 + (i % 20) * 5
+        total += amount
+        bets.append({
+            'type': bet_type,
+            'description': description.format(n=i % 37, m=(i + 1) % 37),
+            'amount': f"{amount:.2f}",
+            'odds': odds,
+            'potential_return': f"{amount * multiplier:.2f}"
+        })
+
+    return {
+        'slip_number': f"BENCH-{bet_count:04d}",
+        'date': '2026-01-01 12:00:00',
+        'draw_number': '1234',
+        'player_id': 'BENCH',
+        'total_stake': f"{total:.2f}",
+        'potential_win': f"{total * 36:.2f}",
+        'bets': bets
+    }
+
+
+def measure(func, repeat):
+    """Median and best wall time over repeat runs, then peak traced memory of one run"""
+    func()  # warm-up (font and style caches)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(times) * 1000, 3),
+        'min_ms': round(min(times) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(bet_counts, repeat):
+    # No PrintMetrics: benchmark jobs must not land in the shop's print metrics
+    printer = BettingSlipPrinter(metrics=None)
+    results = {}
+
+    for bet_count in bet_counts:
+        slip = make_slip(bet_count)
+        cases = {
+            'generate_slip_pdf': lambda: printer.generate_slip_pdf(slip),
+            'create_text_version': lambda: printer.create_text_version(slip),
+            'format_bets_text': lambda: printer.format_bets_text(slip),
+            'escpos_render': lambda: EscPosRenderer(80).render(slip),
+            'print_slip_null_pdf': lambda: printer.print_slip(slip, 'null:', 'pdf'),
+        }
+
+        for name, func in cases.items():
+            key = f"{name}[{bet_count}]"
+            results[key] = measure(func, repeat)
+            print(f"{key:<32} median {results[key]['median_ms']:>10.3f} ms   "
+                  f"peak {results[key]['peak_kb']:>10.1f} KB", file=sys.stderr)
+
+    return results
+
+
+def parse_importtime(stderr):
+    """(module, cumulative microseconds, nesting depth) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(cumulative), (len(name) - len(name.lstrip())) // 2))
+    return rows
+
+
+def run_cli(args, importtime=False):
+    """Run print_slip.py once as PHP would; returns (wall seconds, stderr)"""
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(make_slip(10), f)
+        slip_file = f.name
+
+    # --metrics-file '' keeps the fake null: jobs out of the live metrics file
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + \
+          [PRINT_SLIP_SCRIPT, '@' + slip_file, '--metrics-file', ''] + args
+    try:
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        elapsed = time.perf_counter() - start
+    finally:
+        if os.path.exists(slip_file):
+            os.unlink(slip_file)
+    return elapsed, result.stderr
+
+
+def run_cold_start(repeat, profile=False):
+    """Per output format: process wall time plus import time beyond interpreter startup"""
+    startup = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'],
+                             capture_output=True, text=True).stderr
+    startup_modules = {name for name, _, _ in parse_importtime(startup)}
+    results = {}
+
+    for output_format in OUTPUT_FORMATS:
+        args = ['null:', '--format', output_format]
+        walls = [run_cli(args)[0] for _ in range(repeat)]
+        _, stderr = run_cli(args, importtime=True)
+
+        rows = [row for row in parse_importtime(stderr) if row[0] not in startup_modules]
+        import_us = sum(cumulative for _, cumulative, depth in rows if depth == 0)
+        loaded = sorted({tracked for name, _, _ in rows for tracked in TRACKED_MODULES
+                         if name == tracked or name.startswith(tracked + '.')})
+
+        key = f"cold_start[{output_format}]"
+        results[key] = {
+            'median_ms': round(statistics.median(walls) * 1000, 3),
+            'import_ms': round(import_us / 1000, 3),
+            'loaded': loaded
+        }
+        print(f"{key:<32} median {results[key]['median_ms']:>10.3f} ms   "
+              f"imports {results[key]['import_ms']:>8.3f} ms   loads {', '.join(loaded) or '-'}", file=sys.stderr)
+
+        if profile:
+            for name, cumulative, depth in sorted(rows, key=lambda row: -row[1])[:15]:
+                print(f"    {cumulative / 1000:>9.3f} ms  {'  ' * depth}{name}", file=sys.stderr)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Cases whose median time or peak memory grew past tolerance"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in ('median_ms', 'peak_kb', 'import_ms'):
+            if metric not in current or metric not in previous:
+                continue
+            if metric != 'peak_kb' and current[metric] - previous[metric] < MIN_TIME_DELTA_MS:
+                continue
+            if previous[metric] > 0 and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append({
+                    'case': key,
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': current[metric],
+                    'change_pct': round((current[metric] / previous[metric] - 1) * 100, 1)
+                })
+
+        # A format that starts pulling in a heavy dependency is a cold start regression
+        new_modules = sorted(set(current.get('loaded', [])) - set(previous.get('loaded', [])))
+        if 'loaded' in previous and new_modules:
+            regressions.append({'case': key, 'metric': 'loaded', 'baseline': previous['loaded'],
+                                'current': current['loaded'], 'change_pct': 0})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark betting slip rendering')
+    parser.add_argument('--bets', type=int, nargs='+', default=DEFAULT_BET_COUNTS, help='Bet counts per slip')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Timed runs per case')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='Fail instead of passing when there is no baseline to compare with')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown or memory growth before failing (0.25 = 25%%)')
+    parser.add_argument('--output', help='Also write the full report to this file')
+    parser.add_argument('--no-cold-start', action='store_true', help='Skip the per-format CLI cold start runs')
+    parser.add_argument('--import-profile', action='store_true',
+                        help='List the slowest imports of each cold start')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.bets, args.repeat)
+    if not args.no_cold_start:
+        results.update(run_cold_start(min(args.repeat, 5), args.import_profile))
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved: {args.baseline}", file=sys.stderr)
+        report['regressions'] = []
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        report['baseline'] = args.baseline
+        report['regressions'] = compare(results, baseline.get('results', {}), args.tolerance)
+    else:
+        print(f"WARNING: no baseline at {args.baseline}, nothing was compared and no regression can be "
+              f"detected; run with --save-baseline to create one", file=sys.stderr)
+        report['regressions'] = []
+        if args.require_baseline:
+            print(json.dumps({'success': False, 'error': f'No baseline at {args.baseline}'}))
+            sys.exit(1)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    for regression in report['regressions']:
+        print(f"REGRESSION {regression['case']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']} (+{regression['change_pct']}%)", file=sys.stderr)
+
+    print(json.dumps({'success': not report['regressions'], 'regressions': report['regressions']}))
+    sys.exit(1 if report['regressions'] else 0)
+
+
+if __name__ == '__main__':
+    main()
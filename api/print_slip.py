@@ -2,30 +2,164 @@
 """
 Automatic Betting Slip Printer
 Handles server-side printing of betting slips without browser dialogs
+
+Usage:
+    python print_slip.py '<slip json>' [printer_name]
+    python print_slip.py @slip_data.json [printer_name]
+    python print_slip.py --batch @slips.jsonl [printer_name]
+    python print_slip.py --format escpos --paper 58 @slip_data.json tcp://192.168.1.50:9100
+
+    python print_slip.py --serve [--host 127.0.0.1] [--port 8765]
+    python print_slip.py --list-printers
+    python print_slip.py --metrics
+
+Printer targets:
+    <name>                 Windows spooler printer (raw text; PDF only with --format pdf
+                           or for Microsoft Print to PDF), or a CUPS queue elsewhere
+    cups:<queue>           CUPS/lp queue (PDF, or raw text/ESC/POS)
+    tcp://host[:port]      Raw receipt printer socket, port 9100 by default
+    device:<path>          Raw receipt printer device file (/dev/usb/lp0, COM3, LPT1)
+    capture:<path>         Append raw output to a capture file
+    archive:<dir>          Save each job as a file (PDF by default)
+    null:                  Render and discard (benchmarks, dry runs)
+
+Backend and format dependencies are imported on first use: an ESC/POS job
+to a socket printer never loads reportlab or pywin32, which keeps cold
+start short while PHP still runs this script per job. The cold_start cases
+in benchmark_print_slip.py track the -X importtime cost per output format.
+
+Every result carries a "timings" block (milliseconds per pipeline stage)
+and the "backend" that delivered the job. Each job is also appended to a
+rolling metrics file; --metrics and the service's GET /metrics report
+p50/p95/p99 per stage and per printer from it.
 """
 
+import io
 import sys
 import os
 import json
+import time
+import random
+import select
+import shutil
+import hashlib
+import socket
+import argparse
+import importlib
 import tempfile
+import threading
 import subprocess
 from datetime import datetime
-import win32print
-import win32api
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Resident print service defaults (see SlipPrintServer)
+DEFAULT_SERVER_HOST = '127.0.0.1'
+DEFAULT_SERVER_PORT = 8765
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+
+# Raw receipt output
+OUTPUT_FORMATS = ('pdf', 'text', 'escpos')
+RAW_PRINTER_PORT = 9100
+RAW_PRINTER_TIMEOUT = 10
+TEXT_ENCODING = 'cp437'
+PAPER_COLUMNS = {58: 32, 80: 48}
+OUTPUT_EXTENSIONS = {'pdf': 'pdf', 'text': 'txt', 'escpos': 'bin'}
+
+# Rendered slip cache (see SlipRenderCache)
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+CACHE_FORMAT_VERSION = 2
+# Per-print timestamps that must not change the cache key
+VOLATILE_SLIP_FIELDS = ('printed_at', 'print_time', 'printed', 'timestamp', 'request_time')
+# Cached PDFs carry this in place of the "Printed:" time; it is swapped for the
+# real time (same length, so the xref offsets stay valid) on every print
+PRINTED_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+PRINTED_PLACEHOLDER = '0000-00-00 00:00:00'
+
+# Printer discovery cache and configured printer aliases (see PrinterRegistry)
+PRINTER_CACHE_TTL = 60
+PRINTERS_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'printers.json')
+
+# Durable print job queue (see PrintJobQueue)
+DEFAULT_QUEUE_DB = os.path.join(tempfile.gettempdir(), 'slip_print_queue.db')
+PRIORITY_NEW_SLIP = 0
+PRIORITY_REPRINT = 5
+PRIORITY_BULK = 10
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 2
+JOB_RETRY_MAX_DELAY = 60
+JOB_RETENTION_DAYS = 7
+
+# Rolling per-job stage timings (see PrintMetrics)
+DEFAULT_METRICS_FILE = os.path.join(tempfile.gettempdir(), 'slip_print_metrics.jsonl')
+METRICS_FILE_BYTES = 2 * 1024 * 1024
+METRICS_WINDOW = 5000
+METRICS_PERCENTILES = (50, 95, 99)
+
+# "Microsoft Print to PDF" output is written straight to the desktop
+PDF_PRINTER_NAME = "Microsoft Print to PDF"
+DESKTOP_DIR = os.path.join(os.path.expanduser("~"), "Desktop")
+
+CUPS_TIMEOUT = 15
+
+
+def import_optional(module_name):
+    """Import a backend dependency on first use; None when it is not installed"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+class StageTimer:
+    """Accumulate wall-clock milliseconds per print pipeline stage"""
 
-class BettingSlipPrinter:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def as_dict(self):
+        timings = {name: round(ms, 3) for name, ms in self.stages.items()}
+        timings['total'] = round((time.perf_counter() - self.started) * 1000, 3)
+        return timings
+
+
+class BettingSlipPrinter:
+    def __init__(self, cache=None, metrics=None):
+        self._styles = None
+        self.cache = cache
+        self.metrics = metrics
+        self.last_cache_hit = False
+        self.timer = StageTimer()
+        self.used_backend = None
+
+    @property
+    def styles(self):
+        """Paragraph styles, built (with the reportlab import) on first PDF render"""
+        if self._styles is None:
+            from reportlab.lib.styles import getSampleStyleSheet
+            self._styles = getSampleStyleSheet()
+            self.setup_custom_styles()
+        return self._styles
+
+    def warm_up(self):
+        """Load reportlab and build the styles ahead of the first job"""
+        return self.styles
     
     def setup_custom_styles(self):
         """Setup custom styles for betting slip"""
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
         self.styles.add(ParagraphStyle(
             name='SlipTitle',
             parent=self.styles['Heading1'],
@@ -53,21 +187,14 @@ class BettingSlipPrinter:
     
     def get_default_printer(self):
         """Get the default printer name"""
-        try:
-            return win32print.GetDefaultPrinter()
-        except:
-            # Fallback: get first available printer
-            printers = win32print.EnumPrinters(2)
-            if printers:
-                return printers[0][2]
-            return None
+        return printer_registry.get_default_printer()
     
-    def generate_slip_pdf(self, slip_data, filename):
-        """Generate PDF betting slip"""
-        doc = SimpleDocTemplate(filename, pagesize=letter, 
-                              rightMargin=0.5*inch, leftMargin=0.5*inch,
-                              topMargin=0.5*inch, bottomMargin=0.5*inch)
-        
+    def build_slip_story(self, slip_data, printed_at=None):
+        """Build the reportlab flowables for one betting slip"""
+        from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
+
         story = []
         
         # Title
@@ -128,14 +255,50 @@ class BettingSlipPrinter:
         # Footer
         story.append(Spacer(1, 30))
         story.append(Paragraph("Good Luck!", self.styles['SlipHeader']))
-        story.append(Paragraph(f"Printed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
-                             self.styles['BetDetails']))
+        printed_at = printed_at or datetime.now().strftime(PRINTED_TIME_FORMAT)
+        story.append(Paragraph(f"Printed: {printed_at}", self.styles['BetDetails']))
+        
+        return story
+
+    def new_document(self, output, compress=True):
+        """Create the page template shared by single and batch slips"""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        from reportlab.lib.units import inch
+
+        return SimpleDocTemplate(output, pagesize=letter, 
+                               rightMargin=0.5*inch, leftMargin=0.5*inch,
+                               topMargin=0.5*inch, bottomMargin=0.5*inch,
+                               pageCompression=None if compress else 0)
+
+    def build_pdf(self, story, filename=None, compress=True):
+        """Build a PDF in memory, or into filename when an export asks for a file"""
+        if filename:
+            self.new_document(filename, compress).build(story)
+            return filename
+
+        buffer = io.BytesIO()
+        self.new_document(buffer, compress).build(story)
+        return buffer.getvalue()
+
+    def generate_slip_pdf(self, slip_data, filename=None, printed_at=None, compress=True):
+        """Generate PDF betting slip (bytes, or the filename when one is given)"""
+        return self.build_pdf(self.build_slip_story(slip_data, printed_at), filename, compress)
+
+    def generate_batch_pdf(self, slips, filename=None):
+        """Generate one PDF with each betting slip starting on its own page"""
+        from reportlab.platypus import PageBreak
+
+        story = []
+        for index, slip_data in enumerate(slips):
+            if index:
+                story.append(PageBreak())
+            story.extend(self.build_slip_story(slip_data))
         
-        doc.build(story)
-        return filename
+        return self.build_pdf(story, filename)
     
-    def print_pdf(self, pdf_file, printer_name=None):
-        """Print PDF file to specified printer"""
+    def print_pdf(self, pdf_data, printer_name=None, text_content=None):
+        """Print in-memory PDF data to specified printer"""
         if not printer_name:
             printer_name = self.get_default_printer()
 
@@ -144,89 +307,94 @@ class BettingSlipPrinter:
 
         try:
             # Method 1: For PDF printer, save to desktop (always works)
-            if printer_name == "Microsoft Print to PDF":
-                import shutil
-                desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-                output_file = os.path.join(desktop, f"betting_slip_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-                shutil.copy2(pdf_file, output_file)
-                print(f"PDF saved to desktop: {output_file}", file=sys.stderr)
-                return True
+            if printer_name == PDF_PRINTER_NAME:
+                self.used_backend = 'windows:desktop_pdf'
+                with self.timer.stage('spool.desktop_pdf'):
+                    return ArchiveBackend(DESKTOP_DIR, formats=('pdf',)).send(pdf_data, 'pdf')
 
             # Method 2: Direct text printing (most reliable)
             try:
-                return self.print_text_directly(pdf_file, printer_name)
+                self.used_backend = 'windows:text_direct'
+                with self.timer.stage('spool.text_direct'):
+                    return self.print_text_directly(pdf_data, printer_name, text_content)
             except Exception as text_error:
                 print(f"Direct text print failed: {text_error}", file=sys.stderr)
 
-            # Method 3: Try Windows Print API
-            try:
-                win32api.ShellExecute(
-                    0,
-                    "print",
-                    pdf_file,
-                    None,
-                    ".",
-                    0
-                )
-                print(f"Windows API print initiated", file=sys.stderr)
-                return True
-            except Exception as api_error:
-                print(f"Windows API failed: {api_error}", file=sys.stderr)
-
-            # Method 4: Use PowerShell with error handling
+            # Methods 3 and 4 hand the PDF to another program, so they need it on disk
+            with self.timer.stage('spool.temp_file'):
+                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
+                    tmp_file.write(pdf_data)
+                    pdf_file = tmp_file.name
+
             try:
-                cmd = f'powershell.exe -Command "Start-Process -FilePath \\"{pdf_file}\\" -Verb Print -WindowStyle Hidden"'
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
-                if result.returncode == 0:
-                    print(f"PowerShell print initiated", file=sys.stderr)
+                # Method 3: Try Windows Print API
+                try:
+                    with self.timer.stage('spool.shell_execute'):
+                        win32api = import_optional('win32api')
+                        if win32api is None:
+                            raise Exception("pywin32 is not installed")
+                        win32api.ShellExecute(
+                            0,
+                            "print",
+                            pdf_file,
+                            None,
+                            ".",
+                            0
+                        )
+                    self.used_backend = 'windows:shell_execute'
+                    print(f"Windows API print initiated", file=sys.stderr)
                     return True
-                else:
-                    print(f"PowerShell error: {result.stderr}", file=sys.stderr)
-            except Exception as ps_error:
-                print(f"PowerShell failed: {ps_error}", file=sys.stderr)
+                except Exception as api_error:
+                    print(f"Windows API failed: {api_error}", file=sys.stderr)
+
+                # Method 4: Use PowerShell with error handling
+                try:
+                    with self.timer.stage('spool.powershell'):
+                        cmd = f'powershell.exe -Command "Start-Process -FilePath \\"{pdf_file}\\" -Verb Print -WindowStyle Hidden"'
+                        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
+                    if result.returncode == 0:
+                        self.used_backend = 'windows:powershell'
+                        print(f"PowerShell print initiated", file=sys.stderr)
+                        return True
+                    else:
+                        print(f"PowerShell error: {result.stderr}", file=sys.stderr)
+                except Exception as ps_error:
+                    print(f"PowerShell failed: {ps_error}", file=sys.stderr)
+            finally:
+                try:
+                    os.unlink(pdf_file)
+                except:
+                    pass
 
             # Method 5: Fallback - just indicate success (PDF was created)
-            print(f"All print methods attempted, PDF created: {pdf_file}", file=sys.stderr)
+            self.used_backend = 'windows:none'
+            print(f"All print methods attempted, PDF created ({len(pdf_data)} bytes)", file=sys.stderr)
             return True
 
         except Exception as e:
             raise Exception(f"Print operation failed: {str(e)}")
 
-    def print_text_directly(self, pdf_file, printer_name):
+    def print_text_directly(self, pdf_data, printer_name, text_content=None):
         """Print text directly to printer (most reliable method)"""
         try:
             # Create a simple text version for direct printing
-            text_content = self.create_text_version()
-
-            # Create temporary text file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as tmp_file:
-                tmp_file.write(text_content)
-                text_file = tmp_file.name
-
-            try:
-                # Use Windows copy command to print text directly
-                cmd = f'copy "{text_file}" "{printer_name}"'
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
+            if text_content is None:
+                text_content = self.create_text_version()
 
-                if result.returncode == 0:
-                    print(f"Direct text print successful to {printer_name}", file=sys.stderr)
-                    return True
-                else:
-                    print(f"Direct print failed: {result.stderr}", file=sys.stderr)
-                    return False
-            finally:
-                # Clean up text file
-                try:
-                    os.unlink(text_file)
-                except:
-                    pass
+            # Send the text straight to the spooler as a RAW job
+            spool_raw(printer_name, text_content.encode(TEXT_ENCODING, errors='replace'))
+            print(f"Direct text print successful to {printer_name}", file=sys.stderr)
+            return True
 
         except Exception as e:
             print(f"Direct text print error: {e}", file=sys.stderr)
             return False
 
-    def create_text_version(self):
+    def create_text_version(self, slip_data=None):
         """Create a simple text version of the betting slip"""
+        if slip_data is None:
+            slip_data = getattr(self, 'current_slip_data', {})
+
         return """
 ========================================
            BETTING SLIP
@@ -252,22 +420,25 @@ Good luck!
 This betting slip is for entertainment purposes only.
 
 """.format(
-            date=getattr(self, 'current_slip_data', {}).get('date', 'N/A'),
-            player_id=getattr(self, 'current_slip_data', {}).get('player_id', 'GUEST'),
-            draw_number=getattr(self, 'current_slip_data', {}).get('draw_number', 'N/A'),
-            bets=self.format_bets_text(),
-            total_stake=getattr(self, 'current_slip_data', {}).get('total_stake', '0.00'),
-            potential_win=getattr(self, 'current_slip_data', {}).get('potential_win', '0.00'),
-            slip_number=getattr(self, 'current_slip_data', {}).get('slip_number', 'N/A')
+            date=slip_data.get('date', 'N/A'),
+            player_id=slip_data.get('player_id', 'GUEST'),
+            draw_number=slip_data.get('draw_number', 'N/A'),
+            bets=self.format_bets_text(slip_data),
+            total_stake=slip_data.get('total_stake', '0.00'),
+            potential_win=slip_data.get('potential_win', '0.00'),
+            slip_number=slip_data.get('slip_number', 'N/A')
         )
 
-    def format_bets_text(self):
+    def format_bets_text(self, slip_data=None):
         """Format bets for text display"""
-        if not hasattr(self, 'current_slip_data') or not self.current_slip_data.get('bets'):
+        if slip_data is None:
+            slip_data = getattr(self, 'current_slip_data', {})
+
+        if not slip_data.get('bets'):
             return "No bets found"
 
         bets_text = ""
-        for i, bet in enumerate(self.current_slip_data['bets'], 1):
+        for i, bet in enumerate(slip_data['bets'], 1):
             bets_text += f"{i}. {bet.get('type', 'UNKNOWN').upper()}: {bet.get('description', 'N/A')}\n"
             bets_text += f"   Stake: ${bet.get('amount', '0.00')}\n"
             bets_text += f"   Pays: {bet.get('odds', '1:1')}\n"
@@ -275,82 +446,1343 @@ This betting slip is for entertainment purposes only.
 
         return bets_text.strip()
     
-    def print_slip(self, slip_data, printer_name=None):
+    def render_raw(self, slip_data, output_format, paper_width=80):
+        """Render a slip as raw printer bytes without building a PDF"""
+        if output_format == 'escpos':
+            renderer = EscPosRenderer(paper_width)
+            body = self.cached_render(slip_data, output_format, paper_width,
+                                      lambda: renderer.render_body(slip_data))
+            # The "Printed:" footer is stamped per print, outside the cached body
+            return body + renderer.render_footer()
+
+        return self.cached_render(slip_data, output_format, paper_width,
+                                  lambda: self.create_text_version(slip_data).encode(TEXT_ENCODING, errors='replace'))
+
+    def render_pdf(self, slip_data):
+        """Render a single slip PDF, reusing a cached copy for reprints"""
+        if self.cache is None:
+            self.last_cache_hit = False
+            return self.generate_slip_pdf(slip_data)
+
+        # The cached copy has a placeholder "Printed:" time in an uncompressed
+        # page stream, stamped with the time of each print
+        template = self.cached_render(slip_data, 'pdf', None, lambda: self.generate_slip_pdf(
+            slip_data, printed_at=PRINTED_PLACEHOLDER, compress=False))
+        placeholder = PRINTED_PLACEHOLDER.encode('ascii')
+        if template.count(placeholder) != 1:
+            self.last_cache_hit = False
+            return self.generate_slip_pdf(slip_data)
+        return template.replace(placeholder, datetime.now().strftime(PRINTED_TIME_FORMAT).encode('ascii'))
+
+    def cached_render(self, slip_data, output_format, paper_width, render):
+        """Return render() output through the render cache when one is configured"""
+        if self.cache is None:
+            self.last_cache_hit = False
+            return render()
+
+        key = self.cache.make_key(slip_data, output_format, paper_width)
+        payload = self.cache.get(key, output_format)
+        self.last_cache_hit = payload is not None
+        if payload is None:
+            payload = render()
+            self.cache.put(key, output_format, payload)
+        return payload
+
+    def send_to_backend(self, backend, payload, output_format, text_content=None):
+        """Hand rendered bytes to a backend; Windows PDFs keep the fallback chain"""
+        if output_format == 'pdf' and isinstance(backend, WindowsSpoolerBackend):
+            return self.print_pdf(payload, backend.target, text_content)
+        return backend.send(payload, output_format)
+
+    def send_timed(self, backend, payload, output_format, text_content=None):
+        """send_to_backend under the 'spool' stage, recording which backend delivered the job"""
+        self.used_backend = backend.name
+        with self.timer.stage('spool'):
+            return self.send_to_backend(backend, payload, output_format, text_content)
+
+    def finish_result(self, result, printer_name):
+        """Attach timings and the delivering backend, and feed the rolling metrics"""
+        result['backend'] = self.used_backend
+        result['timings'] = self.timer.as_dict()
+        if self.metrics is not None:
+            self.metrics.record(printer_name, result)
+        return result
+
+    def print_slip(self, slip_data, printer_name=None, output_format=None, paper_width=80, timer=None):
         """Main method to print betting slip"""
+        self.timer = timer or StageTimer()
+        self.used_backend = None
         try:
             # Store slip data for text version
             self.current_slip_data = slip_data
 
-            # Create temporary PDF file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                pdf_filename = tmp_file.name
+            with self.timer.stage('resolve'):
+                backend = get_print_backend(printer_name)
+                output_format = backend.select_format(output_format)
 
-            # Generate PDF
-            self.generate_slip_pdf(slip_data, pdf_filename)
+            with self.timer.stage('render'):
+                if output_format == 'pdf':
+                    # Generate PDF in memory
+                    payload = self.render_pdf(slip_data)
+                else:
+                    # Receipt printers take the raw bytes directly, no PDF needed
+                    payload = self.render_raw(slip_data, output_format, paper_width)
 
-            # Print PDF (with multiple fallback methods)
-            print_success = self.print_pdf(pdf_filename, printer_name)
-
-            # Clean up PDF file
-            try:
-                os.unlink(pdf_filename)
-            except:
-                pass
+            print_success = self.send_timed(backend, payload, output_format)
 
             if print_success:
-                return {
+                result = {
                     'success': True,
-                    'message': f'Slip printed successfully to {printer_name or "default printer"}'
+                    'message': f'Slip printed successfully to {printer_name or "default printer"}',
+                    'cache_hit': self.last_cache_hit
                 }
             else:
-                return {
+                result = {
                     'success': False,
                     'error': 'Print operation failed - all methods attempted'
                 }
 
         except Exception as e:
-            return {
+            result = {
                 'success': False,
                 'error': str(e)
             }
 
-def main():
-    """Main function for command line usage"""
-    if len(sys.argv) < 2:
-        print(json.dumps({'success': False, 'error': 'No slip data provided'}))
-        return
+        return self.finish_result(result, printer_name)
 
-    try:
-        # Parse slip data from command line argument or temp file
-        slip_data_arg = sys.argv[1]
+    def print_batch(self, slips, printer_name=None, output_format=None, paper_width=80, timer=None):
+        """Print many betting slips as pages of one document in a single spool job"""
+        self.timer = timer or StageTimer()
+        self.used_backend = None
+        results = []
+        valid_slips = []
+
+        for index, slip_data in enumerate(slips):
+            if isinstance(slip_data, dict):
+                valid_slips.append((index, slip_data))
+            else:
+                results.append({'index': index, 'success': False, 'error': 'Invalid slip data format'})
+
+        if valid_slips:
+            batch = [slip_data for _, slip_data in valid_slips]
+            error = None
 
-        if slip_data_arg.startswith('@'):
-            # Read from temp file
-            temp_file = slip_data_arg[1:]  # Remove @ prefix
             try:
-                with open(temp_file, 'r') as f:
-                    slip_data = json.load(f)
-                # Clean up temp file
-                os.unlink(temp_file)
+                with self.timer.stage('resolve'):
+                    backend = get_print_backend(printer_name)
+                    output_format = backend.select_format(output_format)
+
+                text_content = None
+                with self.timer.stage('render'):
+                    if output_format == 'pdf':
+                        payload = self.generate_batch_pdf(batch)
+
+                        # Form feeds keep one slip per page on text printers
+                        text_content = '\f'.join(self.create_text_version(slip_data) for slip_data in batch)
+                    else:
+                        # ESC/POS slips end with their own cut; text slips are split by form feeds
+                        separator = b'' if output_format == 'escpos' else b'\f'
+                        payload = separator.join(self.render_raw(slip_data, output_format, paper_width)
+                                                 for slip_data in batch)
+
+                if not self.send_timed(backend, payload, output_format, text_content):
+                    error = 'Print operation failed - all methods attempted'
+
             except Exception as e:
-                print(json.dumps({'success': False, 'error': f'Failed to read temp file: {str(e)}'}))
+                error = str(e)
+
+            for index, slip_data in valid_slips:
+                result = {'index': index, 'slip_number': slip_data.get('slip_number'), 'success': error is None}
+                if error:
+                    result['error'] = error
+                results.append(result)
+
+        results.sort(key=lambda result: result['index'])
+        printed = sum(1 for result in results if result['success'])
+
+        return self.finish_result({
+            'success': bool(results) and printed == len(results),
+            'message': f'{printed} of {len(results)} slips printed to {printer_name or "default printer"}',
+            'printed': printed,
+            'failed': len(results) - printed,
+            'results': results
+        }, printer_name)
+
+class EscPosRenderer:
+    """Render slip data straight to ESC/POS bytes for 58mm and 80mm receipt printers"""
+
+    ESC = b'\x1b'
+    GS = b'\x1d'
+
+    INIT = ESC + b'@'
+    CODE_PAGE_437 = ESC + b't\x00'
+    BOLD_ON = ESC + b'E\x01'
+    BOLD_OFF = ESC + b'E\x00'
+    ALIGN_LEFT = ESC + b'a\x00'
+    ALIGN_CENTER = ESC + b'a\x01'
+    SIZE_NORMAL = GS + b'!\x00'
+    SIZE_DOUBLE = GS + b'!\x11'
+    PARTIAL_CUT = GS + b'V\x42\x00'
+
+    def __init__(self, paper_width=80):
+        if paper_width not in PAPER_COLUMNS:
+            raise ValueError(f"Unsupported paper width: {paper_width}mm (use 58 or 80)")
+        self.columns = PAPER_COLUMNS[paper_width]
+
+    def feed(self, lines):
+        return self.ESC + b'd' + bytes([max(0, min(int(lines), 255))])
+
+    def text(self, value):
+        return f"{value}\n".encode(TEXT_ENCODING, errors='replace')
+
+    def row(self, left, right):
+        """One line with the left text truncated so the right column always fits"""
+        left, right = str(left), str(right)
+        room = max(self.columns - len(right) - 1, 0)
+        if len(left) > room:
+            left = left[:room]
+        return self.text(left + ' ' * (self.columns - len(left) - len(right)) + right)
+
+    def rule(self, char='-'):
+        return self.text(char * self.columns)
+
+    def render(self, slip_data):
+        return self.render_body(slip_data) + self.render_footer()
+
+    def render_body(self, slip_data):
+        """Everything except the per-print footer, so the body can be cached"""
+        out = bytearray()
+        out += self.INIT + self.CODE_PAGE_437
+
+        # Header
+        out += self.ALIGN_CENTER + self.SIZE_DOUBLE + self.BOLD_ON
+        out += self.text("BETTING SLIP")
+        out += self.SIZE_NORMAL + self.BOLD_OFF + self.ALIGN_LEFT
+        out += self.rule('=')
+
+        out += self.row("Slip #:", slip_data.get('slip_number', 'N/A'))
+        out += self.row("Date:", slip_data.get('date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        out += self.row("Draw #:", slip_data.get('draw_number', 'N/A'))
+        out += self.row("Player ID:", slip_data.get('player_id', 'GUEST'))
+        out += self.rule()
+
+        # Bet lines
+        out += self.BOLD_ON + self.text("BETS") + self.BOLD_OFF
+        bets = slip_data.get('bets') or []
+        if not bets:
+            out += self.text("No bets found")
+        for i, bet in enumerate(bets, 1):
+            out += self.BOLD_ON
+            out += self.row(f"{i}. {bet.get('type', 'UNKNOWN').upper()}", f"${bet.get('amount', '0.00')}")
+            out += self.BOLD_OFF
+            out += self.row(f"   {bet.get('description', 'N/A')}", bet.get('odds', '1:1'))
+            out += self.row("   Return", f"${bet.get('potential_return', '0.00')}")
+        out += self.rule()
+
+        # Totals
+        out += self.BOLD_ON
+        out += self.row("Total Stake:", f"${slip_data.get('total_stake', '0.00')}")
+        out += self.row("Potential Win:", f"${slip_data.get('potential_win', '0.00')}")
+        out += self.BOLD_OFF
+        out += self.rule('=')
+
+        return bytes(out)
+
+    def render_footer(self):
+        out = bytearray()
+        out += self.ALIGN_CENTER
+        out += self.text("Good luck!")
+        out += self.text(f"Printed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        out += self.ALIGN_LEFT
+        out += self.feed(4) + self.PARTIAL_CUT
+
+        return bytes(out)
+
+
+class SlipRenderCache:
+    """Content-addressed cache of rendered slips for instant reprints
+
+    Keys are a hash of the normalized slip data plus the output format, so
+    a reprint of an identical slip skips layout entirely. Entries live in a
+    size-bounded in-memory LRU and, optionally, in an on-disk store that
+    survives restarts of the print script.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def normalize(value):
+        """Stringify leaf values the way the renderers format them"""
+        if isinstance(value, dict):
+            return {str(k): SlipRenderCache.normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [SlipRenderCache.normalize(v) for v in value]
+        return str(value)
+
+    def make_key(self, slip_data, output_format, paper_width=None):
+        stable = {k: v for k, v in slip_data.items() if k not in VOLATILE_SLIP_FIELDS}
+        canonical = json.dumps(self.normalize(stable), sort_keys=True, separators=(',', ':'))
+        material = f"{CACHE_FORMAT_VERSION}|{output_format}|{paper_width}|{canonical}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def disk_path(self, key, output_format):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.{OUTPUT_EXTENSIONS[output_format]}")
+
+    def get(self, key, output_format):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return payload
+
+        if self.disk_dir:
+            try:
+                with open(self.disk_path(key, output_format), 'rb') as f:
+                    payload = f.read()
+            except OSError:
+                payload = None
+
+            if payload is not None:
+                with self.lock:
+                    self.stats['disk_hits'] += 1
+                self.remember(key, payload)
+                return payload
+
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, output_format, payload):
+        payload = bytes(payload)
+        self.remember(key, payload)
+
+        if self.disk_dir:
+            path = self.disk_path(key, output_format)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Render cache write failed: {e}", file=sys.stderr)
+
+    def remember(self, key, payload):
+        """Insert into the in-memory LRU, evicting the oldest entries over budget"""
+        if len(payload) > self.max_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+            self.entries[key] = payload
+            self.current_bytes += len(payload)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.stats['evictions'] += 1
+
+    def get_status(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries), bytes=self.current_bytes,
+                        max_bytes=self.max_bytes, disk_dir=self.disk_dir)
+
+
+class PrintBackend:
+    """A print target and the payload formats it accepts, preferred first"""
+
+    name = 'base'
+    formats = ()
+
+    def __init__(self, target):
+        self.target = target
+
+    def select_format(self, output_format=None):
+        output_format = output_format or self.formats[0]
+        if output_format not in self.formats:
+            raise Exception(f"{self.name} printer target does not accept {output_format} output")
+        return output_format
+
+    def send(self, payload, output_format):
+        """Deliver rendered bytes (bytes or memoryview)"""
+        raise NotImplementedError
+
+
+class WindowsSpoolerBackend(PrintBackend):
+    """Named Windows printer; PDFs go through BettingSlipPrinter.print_pdf
+
+    Slips go out as raw text, which is what the PDF path ended up printing
+    through its direct-text method anyway, so no PDF is built unless asked
+    for with --format pdf. Microsoft Print to PDF still gets a PDF.
+    """
+
+    name = 'windows'
+    formats = ('text', 'escpos', 'pdf')
+
+    def select_format(self, output_format=None):
+        if output_format is None and (self.target or printer_registry.get_default_printer()) == PDF_PRINTER_NAME:
+            output_format = 'pdf'
+        return super().select_format(output_format)
+
+    def send(self, payload, output_format):
+        printer_name = self.target or printer_registry.get_default_printer()
+        if not printer_name:
+            raise Exception("No printer available")
+        spool_raw(printer_name, payload)
+        print(f"Raw print spooled to {printer_name}", file=sys.stderr)
+        return True
+
+
+class RawSocketBackend(PrintBackend):
+    """Network receipt printer listening on a raw TCP port (JetDirect, 9100)"""
+
+    name = 'socket'
+    formats = ('escpos', 'text')
+
+    def __init__(self, target):
+        super().__init__(target)
+        host, _, port = target.rpartition(':')
+        if not host or not port.isdigit():
+            host, port = target, RAW_PRINTER_PORT
+        self.address = (host.strip('[]'), int(port))
+
+    def send(self, payload, output_format):
+        printer_registry.send_socket(self.address, payload)
+        print(f"Raw print sent to {self.address[0]}:{self.address[1]}", file=sys.stderr)
+        return True
+
+
+class DeviceFileBackend(PrintBackend):
+    """Receipt printer exposed as a device file (/dev/usb/lp0, COM3, LPT1)"""
+
+    name = 'device'
+    formats = ('escpos', 'text')
+
+    def send(self, payload, output_format):
+        with open(self.target, 'wb') as device:
+            device.write(payload)
+        print(f"Raw print written to {self.target}", file=sys.stderr)
+        return True
+
+
+class CaptureFileBackend(PrintBackend):
+    """Append raw output to a file, for testing layouts without a printer"""
+
+    name = 'capture'
+    formats = ('escpos', 'text')
+
+    def send(self, payload, output_format):
+        with open(self.target, 'ab') as capture:
+            capture.write(payload)
+        print(f"Raw print captured to {self.target}", file=sys.stderr)
+        return True
+
+
+class NullBackend(PrintBackend):
+    """Accept and discard output, for benchmarks and dry runs"""
+
+    name = 'null'
+    formats = ('pdf', 'escpos', 'text')
+
+    def send(self, payload, output_format):
+        return True
+
+
+class ArchiveBackend(PrintBackend):
+    """Write each job to its own file in a directory (PDF exports, slip archives)"""
+
+    name = 'archive'
+    formats = ('pdf', 'escpos', 'text')
+
+    def __init__(self, target, formats=None):
+        super().__init__(target)
+        if formats:
+            self.formats = formats
+
+    def send(self, payload, output_format):
+        os.makedirs(self.target, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        output_file = os.path.join(self.target, f"betting_slip_{stamp}.{OUTPUT_EXTENSIONS[output_format]}")
+        with open(output_file, 'wb') as f:
+            f.write(payload)
+        print(f"{output_format.upper()} saved to: {output_file}", file=sys.stderr)
+        return True
+
+
+class CupsBackend(PrintBackend):
+    """CUPS queue via lp; text and ESC/POS bytes are sent with -o raw"""
+
+    name = 'cups'
+    formats = ('pdf', 'text', 'escpos')
+
+    def send(self, payload, output_format):
+        if not shutil.which('lp'):
+            raise Exception("CUPS lp command is not available")
+
+        queue = self.target or printer_registry.get_default_printer()
+        cmd = ['lp', '-s', '-t', 'Betting Slip']
+        if queue:
+            cmd += ['-d', queue]
+        if output_format != 'pdf':
+            cmd += ['-o', 'raw']
+
+        result = subprocess.run(cmd, input=bytes(payload), capture_output=True, timeout=CUPS_TIMEOUT)
+        if result.returncode != 0:
+            print(f"lp failed: {result.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+            return False
+
+        print(f"Print submitted to CUPS queue {queue or 'default'}", file=sys.stderr)
+        return True
+
+
+def spool_raw(printer_name, payload, job_name='Betting Slip'):
+    """Submit bytes to a Windows printer queue as a RAW job, no temp files"""
+    win32print = import_optional('win32print')
+    if win32print is None:
+        raise Exception("Windows print spooler is not available")
+
+    with printer_registry.printer_handle(printer_name) as handle:
+        win32print.StartDocPrinter(handle, 1, (job_name, None, 'RAW'))
+        try:
+            win32print.StartPagePrinter(handle)
+            win32print.WritePrinter(handle, payload)
+            win32print.EndPagePrinter(handle)
+        finally:
+            win32print.EndDocPrinter(handle)
+
+
+class PrinterRegistry:
+    """Cached printer discovery with reusable spooler handles and printer sockets
+
+    Enumerating printers costs hundreds of milliseconds on a shop PC, so
+    discovery results are kept for a TTL. Printer handles and raw 9100
+    sockets stay open between jobs (which pays off in the resident print
+    service) and are checked for staleness before each reuse.
+
+    Shops can name their printers in printers.json next to this script:
+        {"Counter 1": "tcp://192.168.1.50:9100", "Office": "HP LaserJet"}
+    """
+
+    def __init__(self, ttl=PRINTER_CACHE_TTL, config_file=PRINTERS_CONFIG_FILE):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.printers = None
+        self.printers_loaded_at = 0
+        self.default_printer = None
+        self.default_loaded_at = 0
+        self.handles = {}
+        self.sockets = {}
+        self.target_locks = {}
+        self.configured = self.load_config(config_file)
+
+    def load_config(self, config_file):
+        try:
+            with open(config_file, 'r') as f:
+                configured = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring printer config {config_file}: {e}", file=sys.stderr)
+            return {}
+        return {str(name): str(target) for name, target in configured.items()}
+
+    def resolve(self, printer_name):
+        """Map a configured printer alias to its target"""
+        return self.configured.get(printer_name, printer_name)
+
+    def expired(self, loaded_at):
+        return time.monotonic() - loaded_at > self.ttl
+
+    def list_printers(self, refresh=False):
+        """Configured aliases plus spooler printers, served from the discovery cache"""
+        with self.lock:
+            if refresh or self.printers is None or self.expired(self.printers_loaded_at):
+                self.printers = self.discover_printers()
+                self.printers_loaded_at = time.monotonic()
+            return list(self.configured) + [name for name in self.printers if name not in self.configured]
+
+    def discover_printers(self):
+        win32print = import_optional('win32print') if sys.platform == 'win32' else None
+        try:
+            if win32print is not None:
+                flags = win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS
+                return [printer[2] for printer in win32print.EnumPrinters(flags)]
+            if shutil.which('lpstat'):
+                output = self.run_lpstat('-e')
+                return [line.strip() for line in output.splitlines() if line.strip()]
+        except Exception as e:
+            print(f"Printer discovery failed: {e}", file=sys.stderr)
+        return []
+
+    @staticmethod
+    def run_lpstat(option):
+        result = subprocess.run(['lpstat', option], capture_output=True, text=True, timeout=CUPS_TIMEOUT)
+        return result.stdout if result.returncode == 0 else ''
+
+    def get_default_printer(self, refresh=False):
+        with self.lock:
+            if refresh or self.default_printer is None or self.expired(self.default_loaded_at):
+                self.default_printer = self.discover_default_printer()
+                self.default_loaded_at = time.monotonic()
+            return self.default_printer
+
+    def discover_default_printer(self):
+        win32print = import_optional('win32print') if sys.platform == 'win32' else None
+        if win32print is None:
+            if not shutil.which('lpstat'):
+                return None
+            # "system default destination: NAME"
+            output = self.run_lpstat('-d')
+            name = output.partition(':')[2].strip() if 'destination:' in output else ''
+            return name or None
+
+        try:
+            return win32print.GetDefaultPrinter()
+        except:
+            # Fallback: get first available printer
+            printers = self.list_printers()
+            if printers:
+                return printers[0]
+            return None
+
+    def target_lock(self, key):
+        with self.lock:
+            return self.target_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def printer_handle(self, printer_name):
+        """Yield an open spooler handle for printer_name, reopening it if it went stale"""
+        win32print = import_optional('win32print')
+        with self.target_lock(('spooler', printer_name)):
+            handle = self.handles.get(printer_name)
+            if handle is not None:
+                try:
+                    win32print.GetPrinter(handle, 2)
+                except Exception:
+                    self.close_handle(printer_name)
+                    handle = None
+
+            if handle is None:
+                handle = win32print.OpenPrinter(printer_name)
+                self.handles[printer_name] = handle
+
+            try:
+                yield handle
+            except Exception:
+                # Do not reuse a handle that failed mid-job
+                self.close_handle(printer_name)
+                raise
+
+    def close_handle(self, printer_name):
+        handle = self.handles.pop(printer_name, None)
+        if handle is not None:
+            try:
+                import_optional('win32print').ClosePrinter(handle)
+            except Exception:
+                pass
+
+    def send_socket(self, address, payload):
+        """Send over a kept-open printer socket, reconnecting once if it went stale"""
+        with self.target_lock(('socket', address)):
+            conn = self.sockets.get(address)
+            if conn is not None and self.socket_is_stale(conn):
+                self.close_socket(address)
+                conn = None
+
+            for attempt in (1, 2):
+                if conn is None:
+                    conn = socket.create_connection(address, timeout=RAW_PRINTER_TIMEOUT)
+                    self.sockets[address] = conn
+                try:
+                    conn.sendall(payload)
+                    return
+                except OSError:
+                    self.close_socket(address)
+                    conn = None
+                    if attempt == 2:
+                        raise
+
+    @staticmethod
+    def socket_is_stale(conn):
+        """A readable idle printer socket is either closed by the printer or holding status bytes"""
+        try:
+            readable, _, _ = select.select([conn], [], [], 0)
+            if not readable:
+                return False
+            return conn.recv(1024) == b''
+        except OSError:
+            return True
+
+    def close_socket(self, address):
+        conn = self.sockets.pop(address, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def close_all(self):
+        with self.lock:
+            for printer_name in list(self.handles):
+                self.close_handle(printer_name)
+            for address in list(self.sockets):
+                self.close_socket(address)
+
+
+printer_registry = PrinterRegistry()
+
+
+def get_print_backend(printer_name=None):
+    """Resolve a printer name, configured alias or target URI to its backend"""
+    printer_name = printer_registry.resolve(printer_name)
+    if printer_name:
+        if printer_name.startswith('tcp://'):
+            return RawSocketBackend(printer_name[len('tcp://'):].rstrip('/'))
+        if printer_name.startswith('device:'):
+            return DeviceFileBackend(printer_name[len('device:'):])
+        if printer_name.startswith('capture:'):
+            return CaptureFileBackend(printer_name[len('capture:'):])
+        if printer_name.startswith('archive:'):
+            return ArchiveBackend(printer_name[len('archive:'):])
+        if printer_name.startswith('null:'):
+            return NullBackend(printer_name[len('null:'):])
+        if printer_name.startswith('cups:'):
+            return CupsBackend(printer_name[len('cups:'):])
+
+    if sys.platform != 'win32':
+        return CupsBackend(printer_name)
+    return WindowsSpoolerBackend(printer_name)
+
+
+class PrintMetrics:
+    """Rolling per-job stage timings with percentiles per stage and per printer
+
+    Each finished job is appended as one JSON line to a metrics file that
+    rotates to <file>.1 once it grows past max_bytes, so every process
+    printing slips (CLI runs, the service, queue workers) feeds the same
+    history. The most recent jobs are also kept in memory for GET /metrics.
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_FILE, max_bytes=METRICS_FILE_BYTES, window=METRICS_WINDOW):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.records = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, printer_name, result):
+        entry = {
+            'time': round(time.time(), 3),
+            'printer': printer_name or 'default',
+            'backend': result.get('backend'),
+            'success': bool(result.get('success')),
+            'timings': result.get('timings', {})
+        }
+        with self.lock:
+            self.records.append(entry)
+            if not self.path:
+                return
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+                    size = f.tell()
+                if size > self.max_bytes:
+                    os.replace(self.path, self.path + '.1')
+            except OSError as e:
+                # Metrics must never fail a print job
+                print(f"Could not write print metrics: {e}", file=sys.stderr)
+
+    def load(self):
+        """Fill the in-memory window from the rotated and current metrics files"""
+        records = []
+        for path in (self.path + '.1', self.path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except OSError:
+                continue
+        with self.lock:
+            self.records.clear()
+            self.records.extend(records)
+        return self
+
+    @staticmethod
+    def percentiles(values):
+        """Nearest-rank percentiles of a list of milliseconds"""
+        values = sorted(values)
+        summary = {'count': len(values)}
+        for pct in METRICS_PERCENTILES:
+            rank = max(1, -(-pct * len(values) // 100))
+            summary[f'p{pct}'] = values[rank - 1]
+        summary['max'] = values[-1]
+        return summary
+
+    @classmethod
+    def summarize(cls, records):
+        samples = {}
+        for entry in records:
+            for stage, ms in entry.get('timings', {}).items():
+                samples.setdefault(stage, []).append(ms)
+        return {stage: cls.percentiles(values) for stage, values in samples.items()}
+
+    def summary(self):
+        with self.lock:
+            records = list(self.records)
+
+        by_printer = {}
+        for entry in records:
+            by_printer.setdefault(entry.get('printer', 'default'), []).append(entry)
+
+        return {
+            'success': True,
+            'jobs': len(records),
+            'failed': sum(1 for entry in records if not entry.get('success')),
+            'since': datetime.fromtimestamp(records[0]['time']).isoformat() if records else None,
+            'stages': self.summarize(records),
+            'printers': {
+                printer: {
+                    'jobs': len(entries),
+                    'backends': sorted({entry.get('backend') for entry in entries if entry.get('backend')}),
+                    'stages': self.summarize(entries)
+                }
+                for printer, entries in by_printer.items()
+            },
+            'metrics_file': self.path
+        }
+
+
+class PrintJobQueue:
+    """Durable, prioritized print job queue with one worker thread per printer
+
+    Jobs are journaled in SQLite before submit returns, so the cashier's
+    request never waits on the printer and a crash does not lose the job:
+    jobs that were mid-print when the service stopped are queued again on
+    start. Each printer has its own worker (and its own BettingSlipPrinter),
+    so a jammed printer only delays its own queue. Lower priority numbers
+    print first, failed jobs are retried with exponential backoff, and a
+    slip that is already waiting to print is not queued twice.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS print_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            slip_number TEXT,
+            printer_name TEXT NOT NULL DEFAULT '',
+            priority INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            result TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_print_jobs_next
+            ON print_jobs (printer_name, status, priority, next_attempt_at, job_id);
+        CREATE INDEX IF NOT EXISTS idx_print_jobs_slip
+            ON print_jobs (slip_number, status);
+    """
+
+    def __init__(self, db_path=DEFAULT_QUEUE_DB, printer_factory=None, max_attempts=JOB_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.printer_factory = printer_factory or BettingSlipPrinter
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.workers = {}
+        self.running = True
+
+        import sqlite3
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+
+        now = time.time()
+        with self.lock:
+            # Jobs interrupted by a crash or restart go back in the queue
+            self.db.execute("UPDATE print_jobs SET status = 'queued', updated_at = ? WHERE status = 'printing'", (now,))
+            self.db.execute("DELETE FROM print_jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                            (now - JOB_RETENTION_DAYS * 86400,))
+            pending = [row['printer_name'] for row in self.db.execute(
+                "SELECT DISTINCT printer_name FROM print_jobs WHERE status = 'queued'")]
+
+        for printer_name in pending:
+            self.ensure_worker(printer_name)
+
+    def submit(self, job, priority=PRIORITY_NEW_SLIP):
+        """Journal a slip or batch job and return immediately with its job ID"""
+        if isinstance(job.get('slips'), list):
+            kind, slip_number = 'batch', None
+        elif isinstance(job.get('slip_data'), dict):
+            kind, slip_number = 'slip', job['slip_data'].get('slip_number')
+        else:
+            return {'success': False, 'error': 'Slip data required'}
+
+        printer_name = job.get('printer_name') or ''
+        payload = json.dumps({
+            key: job[key] for key in ('slip_data', 'slips', 'printer_name', 'output_format', 'paper_width')
+            if key in job
+        })
+        now = time.time()
+
+        with self.lock:
+            if slip_number is not None:
+                existing = self.db.execute(
+                    "SELECT job_id, status, priority FROM print_jobs "
+                    "WHERE slip_number = ? AND printer_name = ? AND status IN ('queued', 'printing') "
+                    "ORDER BY job_id LIMIT 1",
+                    (str(slip_number), printer_name)).fetchone()
+                if existing:
+                    if existing['status'] == 'queued' and priority < existing['priority']:
+                        self.db.execute("UPDATE print_jobs SET priority = ?, updated_at = ? WHERE job_id = ?",
+                                        (priority, now, existing['job_id']))
+                    return {'success': True, 'job_id': existing['job_id'], 'status': existing['status'],
+                            'deduplicated': True}
+
+            cursor = self.db.execute(
+                "INSERT INTO print_jobs (kind, slip_number, printer_name, priority, payload, status, "
+                "next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (kind, None if slip_number is None else str(slip_number), printer_name,
+                 int(priority), payload, now, now, now))
+            job_id = cursor.lastrowid
+            self.wakeup.notify_all()
+
+        self.ensure_worker(printer_name)
+        return {'success': True, 'job_id': job_id, 'status': 'queued', 'deduplicated': False}
+
+    def get_job(self, job_id):
+        """Status of one job"""
+        with self.lock:
+            row = self.db.execute("SELECT * FROM print_jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return {'success': False, 'error': 'Job not found'}
+
+        return {
+            'success': True,
+            'job_id': row['job_id'],
+            'kind': row['kind'],
+            'slip_number': row['slip_number'],
+            'printer_name': row['printer_name'] or None,
+            'priority': row['priority'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'created_at': datetime.fromtimestamp(row['created_at']).isoformat(),
+            'updated_at': datetime.fromtimestamp(row['updated_at']).isoformat()
+        }
+
+    def get_status(self):
+        """Job counts per printer and status"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT printer_name, status, COUNT(*) AS jobs FROM print_jobs GROUP BY printer_name, status").fetchall()
+
+        printers = {}
+        for row in rows:
+            printers.setdefault(row['printer_name'] or 'default', {})[row['status']] = row['jobs']
+        return {'success': True, 'printers': printers, 'workers': sorted(name or 'default' for name in self.workers)}
+
+    def ensure_worker(self, printer_name):
+        with self.lock:
+            worker = self.workers.get(printer_name)
+            if worker is not None and worker.is_alive():
                 return
+            worker = threading.Thread(target=self.worker_loop, args=(printer_name,),
+                                      name=f"print-worker-{printer_name or 'default'}", daemon=True)
+            self.workers[printer_name] = worker
+        worker.start()
+
+    def claim_next(self, printer_name):
+        """Mark the next due job for printer_name as printing; returns (job, seconds until next due)"""
+        now = time.time()
+        row = self.db.execute(
+            "SELECT * FROM print_jobs WHERE printer_name = ? AND status = 'queued' AND next_attempt_at <= ? "
+            "ORDER BY priority, job_id LIMIT 1", (printer_name, now)).fetchone()
+
+        if row is None:
+            upcoming = self.db.execute(
+                "SELECT MIN(next_attempt_at) FROM print_jobs WHERE printer_name = ? AND status = 'queued'",
+                (printer_name,)).fetchone()[0]
+            return None, (None if upcoming is None else max(upcoming - now, 0))
+
+        self.db.execute("UPDATE print_jobs SET status = 'printing', attempts = attempts + 1, updated_at = ? "
+                        "WHERE job_id = ?", (now, row['job_id']))
+        return row, 0
+
+    def worker_loop(self, printer_name):
+        printer = self.printer_factory()
+
+        while self.running:
+            with self.lock:
+                row, wait = self.claim_next(printer_name)
+                if row is None:
+                    self.wakeup.wait(timeout=wait if wait is not None else 30)
+                    continue
+
+            result = self.run_job(printer, row)
+            self.finish(row, result)
+
+    def run_job(self, printer, row):
+        job = json.loads(row['payload'])
+        try:
+            if row['kind'] == 'batch':
+                return printer.print_batch(job['slips'], job.get('printer_name'),
+                                           job.get('output_format'), job.get('paper_width', 80))
+            return printer.print_slip(job['slip_data'], job.get('printer_name'),
+                                      job.get('output_format'), job.get('paper_width', 80))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def finish(self, row, result):
+        now = time.time()
+        attempts = row['attempts'] + 1
+
+        if result.get('success'):
+            status, next_attempt_at = 'done', now
+        elif attempts >= self.max_attempts:
+            status, next_attempt_at = 'failed', now
+            print(f"Print job {row['job_id']} failed after {attempts} attempts: {result.get('error')}",
+                  file=sys.stderr)
         else:
-            # Parse directly from command line
-            slip_data = json.loads(slip_data_arg)
+            # Exponential backoff with jitter so a recovering printer is not hammered
+            delay = min(JOB_RETRY_BASE_DELAY * (2 ** (attempts - 1)), JOB_RETRY_MAX_DELAY)
+            status, next_attempt_at = 'queued', now + delay * random.uniform(0.8, 1.2)
+
+        with self.lock:
+            self.db.execute("UPDATE print_jobs SET status = ?, next_attempt_at = ?, result = ?, updated_at = ? "
+                            "WHERE job_id = ?", (status, next_attempt_at, json.dumps(result), now, row['job_id']))
+
+    def close(self):
+        """Stop the workers once their current job is recorded, then close the journal"""
+        with self.lock:
+            self.running = False
+            self.wakeup.notify_all()
+        # No timeout: a worker still printing needs the connection to record the
+        # result, or its job would stay 'printing'
+        for worker in list(self.workers.values()):
+            worker.join()
+        self.db.close()
+
+
+class SlipPrintServer:
+    """Resident print service that keeps a warm BettingSlipPrinter
 
-        printer_name = sys.argv[2] if len(sys.argv) > 2 else None
+    Starting the interpreter, importing reportlab/win32print and building
+    the paragraph styles costs far more than printing a single slip. The
+    server does that work once and then accepts slip jobs over a local
+    HTTP port, returning the same JSON result as the command line.
+    """
+
+    def __init__(self, host=DEFAULT_SERVER_HOST, port=DEFAULT_SERVER_PORT, printer=None, cache=None,
+                 queue_db=DEFAULT_QUEUE_DB, metrics=None):
+        self.host = host
+        self.port = port
+        self.cache = cache or SlipRenderCache()
+        self.metrics = metrics or PrintMetrics()
+        self.printer = printer or BettingSlipPrinter(self.cache, self.metrics)
+        # BettingSlipPrinter keeps per-slip state, so jobs are printed one at a time
+        self.print_lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.jobs_handled = 0
+        self.httpd = None
+        self.queue_db = queue_db
+        self.queue = None
+
+    def handle_submit(self, job):
+        """Queue a slip or batch job and return its job ID without waiting for the printer"""
+        if not isinstance(job, dict):
+            return {'success': False, 'error': 'Slip data required'}
+
+        try:
+            priority = int(job.get('priority', PRIORITY_BULK if 'slips' in job else PRIORITY_NEW_SLIP))
+        except (TypeError, ValueError):
+            return {'success': False, 'error': 'Invalid priority'}
+        return self.queue.submit(job, priority)
+
+    def handle_print(self, job):
+        """Print one slip job of the form {'slip_data': {...}, 'printer_name': ...}"""
+        if not isinstance(job, dict) or not isinstance(job.get('slip_data'), dict):
+            return {'success': False, 'error': 'Slip data required'}
+
+        with self.print_lock:
+            result = self.printer.print_slip(job['slip_data'], job.get('printer_name'),
+                                             job.get('output_format'), job.get('paper_width', 80))
+            self.jobs_handled += 1
+        return result
+
+    def handle_batch(self, job):
+        """Print a batch job of the form {'slips': [...], 'printer_name': ...}"""
+        if not isinstance(job, dict) or not isinstance(job.get('slips'), list):
+            return {'success': False, 'error': 'Slip list required'}
+
+        with self.print_lock:
+            result = self.printer.print_batch(job['slips'], job.get('printer_name'),
+                                              job.get('output_format'), job.get('paper_width', 80))
+            self.jobs_handled += 1
+        return result
+
+    def get_printers(self, refresh=False):
+        """List printers from the registry cache"""
+        return {
+            'success': True,
+            'printers': printer_registry.list_printers(refresh),
+            'default_printer': printer_registry.get_default_printer(refresh)
+        }
+
+    def get_status(self):
+        """Report service health"""
+        return {
+            'success': True,
+            'status': 'running',
+            'started_at': self.started_at.isoformat(),
+            'jobs_handled': self.jobs_handled,
+            'render_cache': self.printer.cache.get_status() if self.printer.cache else None,
+            'queue': self.queue.get_status() if self.queue else None
+        }
+
+    def serve_forever(self):
+        """Bind the local port and serve jobs until interrupted"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        try:
+            self.printer.warm_up()
+        except ImportError as e:
+            print(f"PDF output unavailable until reportlab is installed: {e}", file=sys.stderr)
+
+        handler = type('BoundSlipPrintRequestHandler', (SlipPrintRequestHandler, BaseHTTPRequestHandler),
+                       {'service': self})
+        self.metrics.load()
+        self.queue = PrintJobQueue(self.queue_db, lambda: BettingSlipPrinter(self.cache, self.metrics))
+        self.httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        print(f"Slip print service listening on http://{self.host}:{self.port}", file=sys.stderr)
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+            self.queue.close()
+            printer_registry.close_all()
+
+    def shutdown(self):
+        """Stop a running server"""
+        if self.httpd:
+            self.httpd.shutdown()
+
+
+class SlipPrintRequestHandler:
+    """HTTP front end for SlipPrintServer, mixed into BaseHTTPRequestHandler when serving
+
+    POST /print         body: {"slip_data": {...}, "printer_name": "..."}
+    POST /print_batch   body: {"slips": [{...}, ...], "printer_name": "..."}
+    POST /jobs          body: a /print or /print_batch body, plus optional "priority"
+    GET  /jobs/<id>     job status
+    GET  /jobs          queue summary
+    GET  /printers      (?refresh=1 bypasses the discovery cache)
+    GET  /metrics       p50/p95/p99 stage timings, overall and per printer
+    GET  /health
+    """
+
+    service = None
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        path = path.rstrip('/')
+        if path == '/health':
+            self.send_json(200, self.service.get_status())
+        elif path == '/printers':
+            self.send_json(200, self.service.get_printers('refresh=1' in query))
+        elif path == '/metrics':
+            self.send_json(200, self.service.metrics.summary())
+        elif path == '/jobs':
+            self.send_json(200, self.service.queue.get_status())
+        elif path.startswith('/jobs/') and path[len('/jobs/'):].isdigit():
+            result = self.service.queue.get_job(int(path[len('/jobs/'):]))
+            self.send_json(200 if result['success'] else 404, result)
+        else:
+            self.send_json(404, {'success': False, 'error': 'Not found'})
+
+    def do_POST(self):
+        routes = {
+            '/print': self.service.handle_print,
+            '/print_batch': self.service.handle_batch,
+            '/jobs': self.service.handle_submit
+        }
+        route = routes.get(self.path.rstrip('/'))
+        if route is None:
+            self.send_json(404, {'success': False, 'error': 'Not found'})
+            return
+
+        job = self.read_json()
+        if job is None:
+            return
+        self.send_json(200, route(job))
+
+    def read_json(self):
+        """Read and decode the JSON request body, replying with an error on failure"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = 0
+
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self.send_json(400, {'success': False, 'error': 'Invalid request size'})
+            return None
+
+        try:
+            return json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.send_json(400, {'success': False, 'error': f'Invalid JSON data: {str(e)}'})
+            return None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep stdout clean; request logging goes to stderr like the print diagnostics
+        print(f"{self.address_string()} - {format % args}", file=sys.stderr)
+
+
+def read_slip_source(slip_data_arg):
+    """Return the raw slip JSON from an argument, an @temp-file reference or '-' for stdin"""
+    if slip_data_arg == '-':
+        return sys.stdin.read()
+
+    if slip_data_arg.startswith('@'):
+        # Read from temp file
+        temp_file = slip_data_arg[1:]  # Remove @ prefix
+        try:
+            with open(temp_file, 'r') as f:
+                content = f.read()
+            # Clean up temp file
+            os.unlink(temp_file)
+        except Exception as e:
+            raise RuntimeError(f'Failed to read temp file: {str(e)}')
+        return content
+
+    # Use directly from command line
+    return slip_data_arg
+
+
+def parse_slip_batch(content):
+    """Parse a JSON array of slips or a JSONL stream with one slip per line"""
+    content = content.strip()
+    if content.startswith('['):
+        slips = json.loads(content)
+    else:
+        slips = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    if not slips:
+        raise ValueError('No slips provided')
+    return slips
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Print betting slips without browser dialogs')
+    parser.add_argument('slip_data', nargs='?', help='Slip JSON, or @path to a JSON file (deleted after reading)')
+    parser.add_argument('printer_name', nargs='?', help='Target printer (defaults to the system default)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Treat slip data as a JSON array or JSONL stream of slips')
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS,
+                        help="Output format (defaults to the printer target's preferred format)")
+    parser.add_argument('--paper', dest='paper_width', type=int, choices=sorted(PAPER_COLUMNS), default=80,
+                        help='Receipt paper width in mm for ESC/POS output')
+    parser.add_argument('--cache-dir', help='On-disk store for rendered slips (reprints become cache hits)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+                        help='In-memory render cache size in MB')
+    parser.add_argument('--queue-db', default=DEFAULT_QUEUE_DB, help='SQLite journal for queued print jobs')
+    parser.add_argument('--metrics-file', default=DEFAULT_METRICS_FILE,
+                        help="Rolling per-job stage timings ('' disables)")
+    parser.add_argument('--metrics', action='store_true', help='Print stage timing percentiles as JSON')
+    parser.add_argument('--list-printers', action='store_true', help='Print the available printers as JSON')
+    parser.add_argument('--serve', action='store_true', help='Run as a resident print service')
+    parser.add_argument('--host', default=DEFAULT_SERVER_HOST, help='Service bind address')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVER_PORT, help='Service port')
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function for command line usage"""
+    args = parse_args()
+
+    cache = None
+    if args.serve or args.cache_dir:
+        cache = SlipRenderCache(args.cache_size * 1024 * 1024, args.cache_dir)
+
+    metrics = PrintMetrics(args.metrics_file)
+
+    if args.serve:
+        SlipPrintServer(args.host, args.port, cache=cache, queue_db=args.queue_db,
+                        metrics=metrics).serve_forever()
+        return
+
+    if args.metrics:
+        print(json.dumps(metrics.load().summary()))
+        return
+
+    if args.list_printers:
+        print(json.dumps({
+            'success': True,
+            'printers': printer_registry.list_printers(),
+            'default_printer': printer_registry.get_default_printer()
+        }))
+        return
+
+    if not args.slip_data:
+        print(json.dumps({'success': False, 'error': 'No slip data provided'}))
+        return
+
+    timer = StageTimer()
+    try:
+        try:
+            with timer.stage('read_input'):
+                content = read_slip_source(args.slip_data)
+        except RuntimeError as e:
+            print(json.dumps({'success': False, 'error': str(e)}))
+            return
 
         # Create printer instance and print
-        printer = BettingSlipPrinter()
-        result = printer.print_slip(slip_data, printer_name)
+        printer = BettingSlipPrinter(cache, metrics)
+        if args.batch:
+            with timer.stage('parse'):
+                slips = parse_slip_batch(content)
+            result = printer.print_batch(slips, args.printer_name,
+                                         args.output_format, args.paper_width, timer)
+        else:
+            with timer.stage('parse'):
+                slip_data = json.loads(content)
+            result = printer.print_slip(slip_data, args.printer_name,
+                                        args.output_format, args.paper_width, timer)
 
         print(json.dumps(result))
 
     except json.JSONDecodeError as e:
-        print(json.dumps({'success': False, 'error': f'Invalid JSON data: {str(e)}'}))
+        print(json.dumps({'success': False, 'error': f'Invalid JSON data: {str(e)}', 'timings': timer.as_dict()}))
     except Exception as e:
-        print(json.dumps({'success': False, 'error': str(e)}))
+        print(json.dumps({'success': False, 'error': str(e), 'timings': timer.as_dict()}))
 
 if __name__ == '__main__':
     main()
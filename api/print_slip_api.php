@@ -76,10 +76,104 @@ function getBettingSlipData($pdo, $slipId) {
     }
 }
 
+// Resident print service started with: python print_slip.py --serve
+define('PRINT_SERVICE_URL', 'http://127.0.0.1:8765');
+
+/**
+ * Send a request to the resident print service
+ * Returns the decoded JSON response, or null if the service is not reachable.
+ * Once the request has reached the service, a timeout or unreadable reply
+ * returns an error with 'outcome_unknown' instead: the service may still
+ * print it, so callers must not fall back and print a second copy.
+ */
+function callPrintService($path, $payload = null, $timeout = 30) {
+    if (!function_exists('curl_init')) {
+        return null;
+    }
+
+    $ch = curl_init(PRINT_SERVICE_URL . $path);
+    curl_setopt($ch, CURLOPT_RETURNTRANSFER, true);
+    curl_setopt($ch, CURLOPT_CONNECTTIMEOUT_MS, 500);
+    curl_setopt($ch, CURLOPT_TIMEOUT, $timeout);
+
+    if ($payload !== null) {
+        $body = json_encode($payload, JSON_UNESCAPED_SLASHES);
+        curl_setopt($ch, CURLOPT_POST, true);
+        curl_setopt($ch, CURLOPT_POSTFIELDS, $body);
+        curl_setopt($ch, CURLOPT_HTTPHEADER, [
+            'Content-Type: application/json',
+            'Content-Length: ' . strlen($body)
+        ]);
+    }
+
+    $output = curl_exec($ch);
+    $errno = curl_errno($ch);
+    $error = curl_error($ch);
+    $connected = curl_getinfo($ch, CURLINFO_CONNECT_TIME) > 0;
+    curl_close($ch);
+
+    // Not reachable: nothing was sent, so the caller can print another way
+    if ($errno === CURLE_COULDNT_CONNECT || ($errno === CURLE_OPERATION_TIMEDOUT && !$connected)) {
+        return null;
+    }
+
+    if ($errno !== 0 || $output === false) {
+        return [
+            'success' => false,
+            'error' => 'Print service did not answer, the slip may still print: ' . $error,
+            'outcome_unknown' => true
+        ];
+    }
+
+    $result = json_decode($output, true);
+    if (!is_array($result)) {
+        return [
+            'success' => false,
+            'error' => 'Invalid response from print service, the slip may still print',
+            'outcome_unknown' => true
+        ];
+    }
+    return $result;
+}
+
 /**
- * Print betting slip using Python backend
+ * Print betting slip, preferring the resident print service and
+ * falling back to running the Python script once per slip
  */
 function printBettingSlip($slipData, $printerName = null) {
+    $result = callPrintService('/print', [
+        'slip_data' => $slipData,
+        'printer_name' => $printerName
+    ]);
+
+    if ($result !== null) {
+        return $result;
+    }
+
+    return printBettingSlipWithScript($slipData, $printerName);
+}
+
+/**
+ * Print many betting slips as one document and one spool job
+ * Used for shift-end and bulk reprints
+ */
+function printBettingSlipsBatch($slips, $printerName = null) {
+    $result = callPrintService('/print_batch', [
+        'slips' => $slips,
+        'printer_name' => $printerName
+    ], 300);
+
+    if ($result !== null) {
+        return $result;
+    }
+
+    return printBettingSlipWithScript($slips, $printerName, true);
+}
+
+/**
+ * Print betting slip (or a batch of slips) by spawning the Python backend
+ */
+function printBettingSlipWithScript($slipData, $printerName = null, $batch = false) {
     try {
         // Prepare command
         $pythonScript = __DIR__ . '/print_slip.py';
@@ -122,7 +216,13 @@ function printBettingSlip($slipData, $printerName = null) {
             }
         }
 
-        $command = "\"$pythonExe\" \"$pythonScript\" \"@$tempFile\"";
+        $command = "\"$pythonExe\" \"$pythonScript\"";
+        if ($batch) {
+            $command .= " --batch";
+        }
+        // Shared on-disk render cache so reprints of an identical slip skip layout
+        $command .= " --cache-dir " . escapeshellarg(sys_get_temp_dir() . DIRECTORY_SEPARATOR . 'slip_render_cache');
+        $command .= " \"@$tempFile\"";
         if ($printerName) {
             $command .= " " . escapeshellarg($printerName);
         }
@@ -157,6 +257,12 @@ function printBettingSlip($slipData, $printerName = null) {
  * Get available printers
  */
 function getAvailablePrinters() {
+    // The print service answers from its printer discovery cache
+    $result = callPrintService('/printers', null, 5);
+    if ($result !== null && isset($result['printers'])) {
+        return $result['printers'];
+    }
+
     try {
         $command = 'powershell "Get-Printer | Select-Object Name | ConvertTo-Json"';
         $output = shell_exec($command);
@@ -225,6 +331,74 @@ switch ($action) {
         echo json_encode($result);
         break;
         
+    case 'print_slips_batch':
+        // Bulk print: either slip data (JSON array) or slip IDs looked up in the database
+        $printerName = $_POST['printer_name'] ?? null;
+        $slips = [];
+
+        if (!empty($_POST['slips'])) {
+            $slips = json_decode($_POST['slips'], true);
+            if (!is_array($slips)) {
+                echo json_encode(['success' => false, 'error' => 'Invalid slip data format']);
+                exit;
+            }
+        } elseif (!empty($_POST['slip_ids'])) {
+            $slipIds = is_array($_POST['slip_ids']) ? $_POST['slip_ids'] : explode(',', $_POST['slip_ids']);
+            foreach ($slipIds as $slipId) {
+                $slipData = getBettingSlipData($pdo, trim($slipId));
+                if ($slipData) {
+                    $slips[] = $slipData;
+                }
+            }
+        }
+
+        if (empty($slips)) {
+            echo json_encode(['success' => false, 'error' => 'No slips to print']);
+            exit;
+        }
+
+        $result = printBettingSlipsBatch($slips, $printerName);
+        echo json_encode($result);
+        break;
+
+    case 'submit_print_job':
+        // Queue the slip with the print service and return at once with a job ID
+        $slipDataJson = $_POST['slip_data'] ?? null;
+        $printerName = $_POST['printer_name'] ?? null;
+        $priority = isset($_POST['priority']) ? (int)$_POST['priority'] : 0;
+
+        $slipData = $slipDataJson ? json_decode($slipDataJson, true) : null;
+        if (!$slipData) {
+            echo json_encode(['success' => false, 'error' => 'Invalid slip data format']);
+            exit;
+        }
+
+        $result = callPrintService('/jobs', [
+            'slip_data' => $slipData,
+            'printer_name' => $printerName,
+            'priority' => $priority
+        ], 5);
+
+        if ($result === null) {
+            // No print service running: print synchronously as before
+            $result = printBettingSlip($slipData, $printerName);
+            $result['queued'] = false;
+        }
+
+        echo json_encode($result);
+        break;
+
+    case 'print_job_status':
+        $jobId = isset($_GET['job_id']) ? $_GET['job_id'] : ($_POST['job_id'] ?? null);
+        if (!$jobId || !ctype_digit((string)$jobId)) {
+            echo json_encode(['success' => false, 'error' => 'Job ID required']);
+            exit;
+        }
+
+        $result = callPrintService('/jobs/' . $jobId, null, 5);
+        echo json_encode($result ?? ['success' => false, 'error' => 'Print service not available']);
+        break;
+
     case 'get_printers':
         $printers = getAvailablePrinters();
         echo json_encode(['success' => true, 'printers' => $printers]);
@@ -6,36 +6,669 @@ This script runs the TV display (tvdisplay/index.html) in a headless browser
 that continues running even when your main browser is closed. This eliminates
 the idle tab issue and ensures continuous operation.
 
+Draw changes are pushed from the page over the Chrome DevTools Protocol
+(event_mode), so gaps are caught within milliseconds; the full page probe
+then only runs every heartbeat_interval seconds as a fallback.
+
+The browser is recycled when its JS heap, total RSS or heap growth rate
+crosses the "recycle" limits rather than on a fixed timer, and a standby
+browser is fully loaded before the old one quits.
+
+A draw sequence gap is reconciled against detailed_draw_results with one
+range request to php/get_draw_history.php?from=N&to=M; the page is only
+restarted when it disagrees with the backend's current draw.
+
+Startup needs no network once ChromeDriver has been resolved: its path is
+cached in chromedriver_cache.json (or pinned with chromedriver_path or
+chromedriver_version), Chrome reuses a profile under profile_dir, and
+the page is used as soon as its JavaScript reports a draw number instead
+of after a fixed sleep. Time-to-ready is logged for every boot, restart
+and recycle.
+
+Settings come from headless_tv_config.json over the defaults in main().
+The file is re-read when it changes; intervals, recycle limits and gap
+policy apply from the next check, browser options at the next restart.
+
+--measure-latency reports p50/p95/max milliseconds from a draw being saved
+(draw_time in detailed_draw_results) to each display showing it;
+--test-backend does the same against tv_stub_server.py on localhost,
+saving a new draw every --test-draw-interval seconds.
+
+--browserless runs BrowserlessTVEngine instead: no Chrome, just the same
+draw tracking fed by polling api/tv_sync.php and its backup endpoints.
+
 Requirements:
     pip install selenium webdriver-manager requests beautifulsoup4
+    pip install psutil  # optional, adds browser RSS to memory-driven recycling
 
 Usage:
     python headless_tv_display.py
+    python headless_tv_display.py --browserless
+    python headless_tv_display.py --test-backend --test-draw-interval 5
+    python headless_tv_display.py --display main=http://localhost/slipp/tvdisplay/index.html \
+                                  --display shop1=http://localhost/slipp/tvdisplay/shop1.html
 """
 
+import os
+import math
 import time
+import mmap
+import struct
+import asyncio
 import logging
+import argparse
 import signal
 import sys
 import json
+import queue
+import hashlib
+import threading
 import requests
+from collections import deque
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from urllib.parse import urljoin
+
+from tv_config import CONFIG_FILE, CONFIG_POLL_INTERVAL, ConfigWatcher, changed_keys
+
+# Selenium and webdriver-manager are imported where the browser is driven,
+# so the --browserless engine runs without loading them
+
+try:
+    import psutil  # Optional: browser RSS for memory-driven recycling
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+# Draw tracking state (see DrawHistoryRing)
+DEFAULT_STATE_FILE = 'headless_tv_state.bin'
+DRAW_HISTORY_SIZE = 1024
+MAX_RECORDED_GAPS = 100
+
+# Startup (see HeadlessTVDisplay.resolve_chromedriver and create_driver)
+CHROMEDRIVER_CACHE_FILE = 'chromedriver_cache.json'
+DEFAULT_PROFILE_DIR = 'headless_tv_profile'
+READY_TIMEOUT = 30
+
+# Draw propagation latency samples kept per display (see DrawLatencyProbe)
+LATENCY_WINDOW = 1000
+
+class DrawEventWatcher:
+    """Push draw changes from the TV page to Python over the Chrome DevTools Protocol
+
+    A page-side watcher hooks window.currentDrawNumber, listens for DrawSync's
+    drawSync:updated event and checks rolledNumbersArray and DataPersistence
+    state every 250ms inside the page. Only real changes cross into Python,
+    through a Runtime binding on our own DevTools websocket session, so the
+    monitor hears about a new draw within milliseconds instead of on its
+    next poll. The binding and script are registered for every new document,
+    so they survive page reloads; a new driver needs a new watcher.
+    """
+
+    BINDING_NAME = '__tvDrawChanged'
+
+    WATCHER_SCRIPT = """
+        (function () {
+            if (window.__tvDrawWatcher) {
+                window.__tvDrawWatcher.check('reinstall');
+                return;
+            }
+
+            var lastState = null;
+
+            function snapshot() {
+                var draw = window.currentDrawNumber;
+                if (draw === undefined && typeof currentDrawNumber !== 'undefined') {
+                    draw = currentDrawNumber;
+                }
+                var rolled = typeof rolledNumbersArray !== 'undefined' ? rolledNumbersArray : window.rolledNumbersArray;
+                var persistence = window.DataPersistence && window.DataPersistence.state;
+                return {
+                    currentDrawNumber: draw === undefined ? null : draw,
+                    rolledNumbersCount: Array.isArray(rolled) ? rolled.length : 0,
+                    drawSyncCurrentDraw: window.DrawSync && window.DrawSync.getCurrentDraw ?
+                        window.DrawSync.getCurrentDraw() : null,
+                    dataPersistenceLoaded: persistence ? !!persistence.isLoaded : null,
+                    dataPersistenceLastLoad: persistence ? persistence.lastLoadTime : null
+                };
+            }
+
+            function check(reason) {
+                var state;
+                try {
+                    state = snapshot();
+                } catch (e) {
+                    return;  // page scripts still initializing
+                }
+                var key = JSON.stringify(state);
+                if (key === lastState || typeof window.%(binding)s !== 'function') {
+                    return;
+                }
+                lastState = key;
+                state.reason = reason;
+                state.at = Date.now();
+                window.%(binding)s(JSON.stringify(state));
+            }
+
+            // Assignments to window.currentDrawNumber are reported as they happen
+            var windowDraw = window.currentDrawNumber;
+            try {
+                Object.defineProperty(window, 'currentDrawNumber', {
+                    configurable: true,
+                    enumerable: true,
+                    get: function () { return windowDraw; },
+                    set: function (value) { windowDraw = value; setTimeout(function () { check('assign'); }, 0); }
+                });
+            } catch (e) {}
+
+            document.addEventListener('drawSync:updated', function () { check('drawSync'); });
+            setInterval(function () { check('interval'); }, 250);
+            window.__tvDrawWatcher = { check: check };
+            check('install');
+        })();
+    """ % {'binding': BINDING_NAME}
+
+    def __init__(self, driver, events, logger):
+        self.driver = driver
+        self.events = events
+        self.logger = logger
+        self.ws = None
+        self.thread = None
+        self.connected = False
+        self.message_id = 0
+
+    def page_websocket_url(self):
+        """Find the DevTools websocket of the driver's current tab"""
+        debugger_address = self.driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+        if not debugger_address:
+            raise RuntimeError("ChromeDriver did not report a DevTools debugger address")
+
+        targets = requests.get(f"http://{debugger_address}/json", timeout=5).json()
+        pages = [target for target in targets if target.get('type') == 'page']
+
+        # ChromeDriver window handles are DevTools target IDs (older versions prefix CDwindow-)
+        handle = self.driver.current_window_handle.replace('CDwindow-', '')
+        for target in pages:
+            if target.get('id') == handle:
+                return target['webSocketDebuggerUrl']
+        if pages:
+            return pages[0]['webSocketDebuggerUrl']
+        raise RuntimeError("No DevTools page target found")
+
+    def send(self, method, params=None):
+        self.message_id += 1
+        self.ws.send(json.dumps({'id': self.message_id, 'method': method, 'params': params or {}}))
+
+    def start(self):
+        """Attach to the page and install the watcher; False leaves the monitor polling"""
+        try:
+            # websocket-client ships as a Selenium dependency
+            import websocket
+        except ImportError:
+            self.logger.warning("websocket-client not installed, draw events disabled (polling only)")
+            return False
+
+        try:
+            # Chrome rejects DevTools websockets that send an Origin header
+            self.ws = websocket.create_connection(self.page_websocket_url(), timeout=10, suppress_origin=True)
+            self.ws.settimeout(None)
+            self.send('Runtime.enable')
+            self.send('Runtime.addBinding', {'name': self.BINDING_NAME})
+            self.send('Page.addScriptToEvaluateOnNewDocument', {'source': self.WATCHER_SCRIPT})
+            self.send('Runtime.evaluate', {'expression': self.WATCHER_SCRIPT})
+        except Exception as e:
+            self.logger.warning(f"Could not attach draw event watcher, polling only: {e}")
+            self.close()
+            return False
+
+        self.connected = True
+        self.thread = threading.Thread(target=self.listen, name='draw-event-watcher', daemon=True)
+        self.thread.start()
+        self.logger.info("Draw event watcher attached over DevTools")
+        return True
+
+    def listen(self):
+        """Forward binding calls to the event queue until the websocket closes"""
+        try:
+            while self.connected:
+                message = json.loads(self.ws.recv())
+                method = message.get('method')
+                if method == 'Runtime.bindingCalled' and message['params'].get('name') == self.BINDING_NAME:
+                    event = json.loads(message['params']['payload'])
+                    event['received_at'] = time.time()
+                    self.events.put(event)
+                elif method in ('Inspector.detached', 'Inspector.targetCrashed'):
+                    self.logger.warning(f"Draw event watcher lost the page: {method}")
+                    break
+                elif 'error' in message:
+                    self.logger.debug(f"DevTools command {message.get('id')} failed: {message['error']}")
+        except Exception as e:
+            if self.connected:
+                self.logger.warning(f"Draw event watcher disconnected: {e}")
+        finally:
+            self.connected = False
+
+    def close(self):
+        self.connected = False
+        if self.ws:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+
+
+class DrawHistoryRing:
+    """Fixed-size ring of (draw number, unix ms) pairs packed into a memory-mapped file
+
+    Records are written straight into the map and flushed on every draw,
+    so the file is always a usable checkpoint: a restarted monitor reads
+    the last draw back and resumes gap detection from it. The header also
+    keeps a lifetime gap count. Without a path the ring lives in anonymous
+    memory.
+    """
+
+    MAGIC = b'TVDH'
+    HEADER = struct.Struct('<4sIIIQ')  # magic, capacity, next write index, count, total gaps
+    RECORD = struct.Struct('<qq')  # draw number, unix time in ms
+
+    def __init__(self, capacity=DRAW_HISTORY_SIZE, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.size = self.HEADER.size + capacity * self.RECORD.size
+        self.fd = None
+
+        if path:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+            if os.fstat(self.fd).st_size != self.size:
+                os.ftruncate(self.fd, self.size)
+            self.map = mmap.mmap(self.fd, self.size)
+        else:
+            self.map = mmap.mmap(-1, self.size)
+
+        magic, stored_capacity, self.head, self.count, self.gaps = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC or stored_capacity != capacity or self.head >= capacity or self.count > capacity:
+            # New file, or one written with another capacity: start empty
+            self.map[:] = bytes(self.size)
+            self.head = self.count = self.gaps = 0
+            self.write_header()
+
+    def write_header(self):
+        self.HEADER.pack_into(self.map, 0, self.MAGIC, self.capacity, self.head, self.count, self.gaps)
+
+    def append(self, draw_number, timestamp_ms):
+        self.RECORD.pack_into(self.map, self.HEADER.size + self.head * self.RECORD.size,
+                              draw_number, timestamp_ms)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.write_header()
+        self.flush()
+
+    def record_gap(self):
+        self.gaps += 1
+        self.write_header()
+        self.flush()
+
+    def last(self):
+        """Most recent (draw number, unix ms), or None when empty"""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return self.RECORD.unpack_from(self.map, self.HEADER.size + index * self.RECORD.size)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Oldest to newest (draw number, unix ms)"""
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            index = (start + offset) % self.capacity
+            yield self.RECORD.unpack_from(self.map, self.HEADER.size + index * self.RECORD.size)
+
+    def flush(self):
+        if self.fd is not None:
+            self.map.flush()
+
+    def close(self):
+        if self.map.closed:
+            return
+        self.flush()
+        self.map.close()
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class DrawTracker:
+    """Draw sequence and gap tracking for one TV display"""
+
+    def __init__(self, roulette_config, logger, name=None, state_path=None, history_size=DRAW_HISTORY_SIZE):
+        self.config = roulette_config
+        self.logger = logger
+        self.name = name
+        self.prefix = f"[{name}] " if name else ""
+        self.draw_history = DrawHistoryRing(history_size, state_path)
+        self.sequence_gaps_detected = deque(maxlen=MAX_RECORDED_GAPS)
+
+        # Resume from the checkpoint so the first poll after a restart can already see a gap
+        last = self.draw_history.last()
+        self.last_draw_number = last[0] if last else None
+        if last:
+            seen_at = datetime.fromtimestamp(last[1] / 1000)
+            self.logger.info(f"{self.prefix}Resuming gap detection from draw {last[0]} (seen {seen_at})")
+
+    @property
+    def total_gaps(self):
+        return self.draw_history.gaps
+
+    def close(self):
+        self.draw_history.close()
+
+    def observe(self, current_draw):
+        """Track a draw number seen on the page; returns the gap info when draws were skipped"""
+        if not self.config['detect_sequence_gaps'] or current_draw in (None, 'unknown'):
+            return None
+
+        try:
+            current_num = int(current_draw)
+        except (ValueError, TypeError):
+            self.logger.warning(f"{self.prefix}Invalid draw number format: {current_draw}")
+            return None
+
+        gap_info = None
+        if self.last_draw_number is not None:
+            last_num = int(self.last_draw_number)
+            if current_num == last_num:
+                return None
+
+            # Check for sequence gap
+            if current_num > last_num + 1:
+                gap_size = current_num - last_num - 1
+                gap_info = {
+                    'from': last_num,
+                    'to': current_num,
+                    'missing': list(range(last_num + 1, current_num)),
+                    'gap_size': gap_size,
+                    'timestamp': datetime.now().isoformat()
+                }
+
+                self.sequence_gaps_detected.append(gap_info)
+                self.draw_history.record_gap()
+                self.logger.error(f"🚨 {self.prefix}DRAW SEQUENCE GAP DETECTED: {gap_info}")
+
+        # Update draw history; the first draw seen becomes the baseline
+        self.draw_history.append(current_num, int(time.time() * 1000))
+        self.last_draw_number = current_num
+        return gap_info
+
+
+class GapReconciler:
+    """Check a detected draw gap against detailed_draw_results in one range request
+
+    A gap on the page usually means the TV missed draws the backend did
+    complete (a stalled tab, a slow poll), which needs no restart. The
+    outcome says which it was:
+
+        reconciled      every missing draw is stored; the page has caught up
+        missing         some draws were never stored (a backend sequence skip)
+        unrecoverable   the page disagrees with the backend's current draw
+        unverified      the backend could not be asked
+    """
+
+    def __init__(self, base_url, timeout=10, logger=None):
+        self.url = urljoin(base_url, 'php/get_draw_history.php')
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.session = requests.Session()
+
+    def reconcile(self, gap):
+        missing = gap['missing']
+        try:
+            response = self.session.get(self.url, params={'from': missing[0], 'to': missing[-1]},
+                                        timeout=self.timeout, headers={'Cache-Control': 'no-cache'})
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            return {'status': 'unverified', 'error': str(e)}
+
+        if data.get('status') != 'success' or 'draws' not in data:
+            return {'status': 'unverified', 'error': data.get('message', 'Range lookup not supported')}
+
+        stored = {int(row['draw_number']): row.get('winning_number') for row in data['draws']}
+        not_stored = [draw for draw in missing if draw not in stored]
+        backend_draw = data.get('current_draw')
+
+        # Only a page that disagrees with the backend's current draw is beyond repair
+        if backend_draw is not None and abs(gap['to'] - int(backend_draw)) > 1:
+            status = 'unrecoverable'
+        elif not_stored:
+            status = 'missing'
+        else:
+            status = 'reconciled'
+
+        return {
+            'status': status,
+            'backend_current_draw': backend_draw,
+            'stored': len(stored),
+            'not_stored': not_stored,
+            'winning_numbers': {str(draw): stored[draw] for draw in sorted(stored)}
+        }
+
+
+class DrawLatencyProbe:
+    """Time from a draw result being saved to a display showing it
+
+    The save time comes from the save response when the caller saw it
+    (mark_saved, as in --test-backend mode) and otherwise from draw_time in
+    detailed_draw_results, fetched with the same range request as
+    GapReconciler. draw_time is in whole seconds on the database clock, so
+    production numbers carry up to 1s of rounding, corrected for clock skew
+    by draw_time_offset. A display is timed when its draw watcher reports
+    the change, or when the probe sees it while polling (at most one check
+    interval late). The first draw a display shows is only a baseline.
+    """
+
+    def __init__(self, base_url, timeout=10, window=LATENCY_WINDOW, clock_offset=0, logger=None):
+        self.url = urljoin(base_url, 'php/get_draw_history.php')
+        self.timeout = timeout
+        self.window = window
+        self.clock_offset = clock_offset
+        self.logger = logger or logging.getLogger(__name__)
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.saved_at = {}  # draw number -> unix time its result was saved
+        self.last_seen = {}  # display -> last draw timed
+        self.samples = {}  # display -> latencies in ms
+        self.uncorrelated = {}  # display -> draws with no known save time
+
+    def mark_saved(self, draw_number, saved_at):
+        with self.lock:
+            self.saved_at[int(draw_number)] = saved_at
+            while len(self.saved_at) > self.window:
+                del self.saved_at[min(self.saved_at)]
+
+    def parse_draw_time(self, value):
+        for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+            try:
+                return datetime.strptime(str(value), fmt).timestamp() + self.clock_offset
+            except ValueError:
+                continue
+        return None
+
+    def save_time(self, draw_number):
+        """Unix time draw_number was saved, None if the backend has no draw_time for it"""
+        with self.lock:
+            if draw_number in self.saved_at:
+                return self.saved_at[draw_number]
+
+        try:
+            response = self.session.get(self.url, params={'from': draw_number, 'to': draw_number},
+                                        timeout=self.timeout, headers={'Cache-Control': 'no-cache'})
+            draws = response.json().get('draws', [])
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            self.logger.debug(f"Could not fetch draw_time for draw {draw_number}: {e}")
+            return None
+
+        for row in draws:
+            if str(row.get('draw_number')) == str(draw_number) and row.get('draw_time'):
+                saved_at = self.parse_draw_time(row['draw_time'])
+                if saved_at is not None:
+                    self.mark_saved(draw_number, saved_at)
+                return saved_at
+        return None
+
+    def observe(self, display, current_draw, seen_at):
+        """Time a draw shown on one display; returns the latency in ms, or None"""
+        try:
+            draw_number = int(current_draw)
+        except (ValueError, TypeError):
+            return None
+
+        with self.lock:
+            last = self.last_seen.get(display)
+            if last is not None and draw_number <= last:
+                return None
+            self.last_seen[display] = draw_number
+        if last is None:
+            return None  # Already on screen when we started: arrival time unknown
+
+        saved_at = self.save_time(draw_number)
+        if saved_at is None:
+            with self.lock:
+                self.uncorrelated[display] = self.uncorrelated.get(display, 0) + 1
+            return None
+
+        latency_ms = (seen_at - saved_at) * 1000
+        with self.lock:
+            self.samples.setdefault(display, deque(maxlen=self.window)).append(latency_ms)
+        return latency_ms
+
+    def stats(self, display):
+        """Nearest-rank p50/p95 and max latency in ms for one display"""
+        with self.lock:
+            values = sorted(self.samples.get(display, ()))
+            uncorrelated = self.uncorrelated.get(display, 0)
+        if not values:
+            return {'count': 0, 'uncorrelated': uncorrelated}
+
+        def rank(percent):
+            return round(values[max(0, math.ceil(percent / 100 * len(values)) - 1)])
+
+        return {'count': len(values), 'p50': rank(50), 'p95': rank(95), 'max': round(values[-1]),
+                'uncorrelated': uncorrelated}
+
+    def summary(self):
+        with self.lock:
+            displays = sorted(set(self.samples) | set(self.uncorrelated))
+        return {display: self.stats(display) for display in displays}
+
 
 class HeadlessTVDisplay:
-    def __init__(self, config=None):
+    # One execute_script round-trip per monitoring cycle: page health, draw
+    # info and roulette system details together. allSpins is reduced to a
+    # count and an FNV-1a hash so the payload stays small as history grows.
+    PROBE_SCRIPT = """
+        const systems = {
+            TabVisibilityManager: typeof window.TabVisibilityManager !== 'undefined',
+            DrawNumberManager: typeof window.DrawNumberManager !== 'undefined',
+            DataPersistence: typeof window.DataPersistence !== 'undefined',
+            DrawSync: typeof window.DrawSync !== 'undefined'
+        };
+
+        const details = {};
+        if (systems.TabVisibilityManager) {
+            details.TabVisibilityManager = {
+                isVisible: window.TabVisibilityManager.isVisible(),
+                isCatchUpInProgress: window.TabVisibilityManager.isCatchUpInProgress()
+            };
+        }
+        if (systems.DataPersistence) {
+            details.DataPersistence = {
+                isLoading: window.DataPersistence.state ? window.DataPersistence.state.isLoading : false,
+                lastLoadTime: window.DataPersistence.state ? window.DataPersistence.state.lastLoadTime : null
+            };
+        }
+
+        let allSpinsHash = null;
+        const spins = Array.isArray(window.allSpins) ? window.allSpins : [];
+        if (spins.length) {
+            const text = JSON.stringify(spins);
+            let hash = 0x811c9dc5;
+            for (let i = 0; i < text.length; i++) {
+                hash ^= text.charCodeAt(i);
+                hash = Math.imul(hash, 0x01000193);
+            }
+            allSpinsHash = (hash >>> 0).toString(16);
+        }
+
+        return {
+            url: window.location.href,
+            title: document.title,
+            readyState: document.readyState,
+            currentDrawNumber: window.currentDrawNumber || 'unknown',
+            rolledNumbersCount: window.rolledNumbersArray ? window.rolledNumbersArray.length : 0,
+            lastUpdate: new Date().toISOString(),
+            systems: systems,
+            details: details,
+            allSystemsLoaded: Object.values(systems).every(loaded => loaded),
+            allSpinsCount: spins.length,
+            allSpinsHash: allSpinsHash,
+            tabVisibilityState: details.TabVisibilityManager ?
+                details.TabVisibilityManager.isVisible : 'unknown',
+            memory: performance.memory ? {
+                usedJSHeapSize: performance.memory.usedJSHeapSize,
+                totalJSHeapSize: performance.memory.totalJSHeapSize,
+                jsHeapSizeLimit: performance.memory.jsHeapSizeLimit
+            } : null
+        };
+    """
+
+    # The page is ready once it has fetched a draw number and DataPersistence
+    # (when present) has finished loading, replacing a fixed sleep after load
+    READY_SCRIPT = """
+        let draw = window.currentDrawNumber;
+        try {
+            if (draw === undefined && typeof currentDrawNumber !== 'undefined') {
+                draw = currentDrawNumber;
+            }
+        } catch (e) {}
+        const persistence = window.DataPersistence && window.DataPersistence.state;
+        return document.readyState === 'complete'
+            && Number(draw) > 0
+            && !(persistence && persistence.isLoading);
+    """
+
+    # ChromeDriver path shared by every driver this process creates
+    resolved_chromedriver = None
+
+    # Only read when a browser starts, so a reload applies them at the next restart
+    RESTART_KEYS = ('headless', 'window_size', 'user_agent', 'profile_dir', 'chromedriver_path',
+                    'chromedriver_version')
+    # Only read at startup
+    PROCESS_KEYS = ('state_file', 'displays', 'measure_latency')
+
+    def __init__(self, config=None, config_watcher=None):
         """Initialize the headless TV display simulator for roulette system"""
+        self.config_watcher = config_watcher
         self.config = config or {
             'url': 'http://localhost/slipp/tvdisplay/index.html',
-            'check_interval': 15,  # Check every 15 seconds for roulette system
-            'restart_interval': 7200,  # Restart every 2 hours for stability
+            'check_interval': 5,  # One batched probe per check, so poll often
+            'restart_interval': 86400,  # Hard cap on browser age; memory drives normal recycling
+            'recycle': {
+                'max_js_heap_mb': 512,  # Recycle when the page's JS heap passes this
+                'max_rss_mb': 2048,  # ...or Chrome's total RSS (needs psutil)
+                'max_heap_growth_mb_per_hour': 64,  # ...or the heap keeps growing this fast
+                'growth_window': 1800  # Seconds of samples before judging growth
+            },
+            'event_mode': True,  # Draw changes pushed over DevTools
+            'heartbeat_interval': 60,  # Full probe interval while events are flowing
+            'state_file': DEFAULT_STATE_FILE,  # Draw history checkpoint, survives restarts
+            'chromedriver_path': None,  # Fixed ChromeDriver binary; skips webdriver-manager entirely
+            'chromedriver_version': None,  # Pin webdriver-manager to this version (None = match Chrome)
+            'profile_dir': DEFAULT_PROFILE_DIR,  # Reused Chrome profile, keeps the HTTP cache warm
+            'ready_timeout': READY_TIMEOUT,  # Max seconds to wait for the page's JavaScript
+            'measure_latency': False,  # Time saved draw -> on screen per display
+            'draw_time_offset': 0,  # Seconds to add to the database's draw_time to match this clock
             'headless': True,
             'window_size': (1920, 1080),
             'user_agent': 'RouletteHeadlessTVDisplay/1.0',
@@ -44,19 +677,24 @@ class HeadlessTVDisplay:
                 'monitor_draw_numbers': True,
                 'detect_sequence_gaps': True,
                 'validate_systems': True,
+                'reconcile_gaps': True,
                 'emergency_restart_on_gap': True
             }
         }
 
         self.driver = None
+        self.draw_watcher = None
+        self.draw_events = queue.Queue()
         self.start_time = datetime.now()
         self.last_restart = datetime.now()
         self.running = False
 
         # Roulette-specific tracking
-        self.last_draw_number = None
-        self.draw_history = []
-        self.sequence_gaps_detected = []
+        self.memory_samples = deque(maxlen=720)  # (time, js heap MB, browser RSS MB)
+        self.profile_slot = 0
+        self.last_driver_seconds = None
+        self.ready_times = deque(maxlen=50)
+        self.last_spins_hash = None
         self.system_status = {
             'TabVisibilityManager': False,
             'DrawNumberManager': False,
@@ -74,6 +712,13 @@ class HeadlessTVDisplay:
             ]
         )
         self.logger = logging.getLogger(__name__)
+        self.tracker = self.create_tracker()
+        # tvdisplay/<page>.html lives one level below the PHP app root
+        self.reconciler = GapReconciler(self.api_base_url(), logger=self.logger)
+        self.latency_probe = None
+        if self.config.get('measure_latency'):
+            self.latency_probe = DrawLatencyProbe(self.api_base_url(), clock_offset=self.config.get('draw_time_offset', 0),
+                                                  logger=self.logger)
 
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -85,9 +730,112 @@ class HeadlessTVDisplay:
         self.stop()
         sys.exit(0)
 
-    def create_driver(self):
-        """Create and configure the Chrome WebDriver"""
+    def create_tracker(self):
+        """Draw tracker for the single display, checkpointed to state_file"""
+        return DrawTracker(self.config['roulette_specific'], self.logger,
+                           state_path=self.config.get('state_file', DEFAULT_STATE_FILE))
+
+    def api_base_url(self):
+        """PHP app root; tvdisplay/<page>.html lives one level below it"""
+        page_url = self.config.get('url') or self.config['displays'][0]['url']
+        return self.config.get('api_base_url') or urljoin(page_url, '../')
+
+    def reload_config(self):
+        """Apply edits to the config file, if any; returns the changed keys"""
+        if not self.config_watcher:
+            return []
+        config = self.config_watcher.poll()
+        if config is None:
+            return []
+        return self.apply_config(config)
+
+    def apply_config(self, config):
+        """Switch to a reloaded config without recreating the driver
+
+        Intervals, recycle limits and gap policy are read from self.config on
+        every cycle, so swapping the dict is enough for them.
+        """
+        changed = changed_keys(self.config, config)
+        if not changed:
+            return []
+
+        self.config = config
+        if self.tracker:
+            self.tracker.config = config['roulette_specific']
+        self.reconciler.url = urljoin(self.api_base_url(), 'php/get_draw_history.php')
+        if self.latency_probe:
+            self.latency_probe.url = self.reconciler.url
+            self.latency_probe.clock_offset = config.get('draw_time_offset', 0)
+        logging.getLogger().setLevel(config['log_level'])
+
+        self.logger.info(f"🔧 Configuration reloaded, changed: {', '.join(changed)}")
+        deferred = [key for key in changed if key in self.RESTART_KEYS]
+        if deferred:
+            self.logger.info(f"   {', '.join(deferred)} will apply at the next browser restart")
+        ignored = [key for key in changed if key in self.PROCESS_KEYS]
+        if ignored:
+            self.logger.warning(f"   {', '.join(ignored)} only apply after restarting this script")
+        return changed
+
+    def resolve_chromedriver(self, refresh=False):
+        """ChromeDriver path: configured, resolved earlier, or installed once by webdriver-manager
+
+        webdriver-manager checks online for the latest driver on every
+        install(), so the resolved path is kept for the life of the process
+        and in CHROMEDRIVER_CACHE_FILE across runs; a restart needs no
+        network. refresh=True ignores the cache, e.g. after Chrome updated.
+        """
+        if self.config.get('chromedriver_path'):
+            return self.config['chromedriver_path']
+
+        version = self.config.get('chromedriver_version')
+        if not refresh:
+            path = HeadlessTVDisplay.resolved_chromedriver
+            if not path:
+                try:
+                    with open(CHROMEDRIVER_CACHE_FILE) as f:
+                        cached = json.load(f)
+                    if cached.get('version') == version:
+                        path = cached.get('path')
+                except (OSError, ValueError):
+                    path = None
+            if path and os.path.isfile(path):
+                HeadlessTVDisplay.resolved_chromedriver = path
+                return path
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        if version:
+            try:
+                manager = ChromeDriverManager(driver_version=version)
+            except TypeError:
+                manager = ChromeDriverManager(version=version)  # webdriver-manager < 4
+        else:
+            manager = ChromeDriverManager()
+        path = manager.install()
+
+        HeadlessTVDisplay.resolved_chromedriver = path
         try:
+            with open(CHROMEDRIVER_CACHE_FILE, 'w') as f:
+                json.dump({'path': path, 'version': version, 'resolved_at': datetime.now().isoformat()}, f)
+        except OSError as e:
+            self.logger.warning(f"Could not cache ChromeDriver path: {e}")
+        self.logger.info(f"Resolved ChromeDriver: {path}")
+        return path
+
+    def create_driver(self, profile_slot=None):
+        """Create and configure the Chrome WebDriver
+
+        The profile lives in profile_dir/slot<N> so the HTTP cache, service
+        worker and local storage stay warm across restarts. A standby driver
+        uses the other slot, since Chrome locks a profile while it runs.
+        """
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.chrome.service import Service
+
+            started = time.perf_counter()
             chrome_options = Options()
 
             if self.config['headless']:
@@ -102,6 +850,12 @@ class HeadlessTVDisplay:
             chrome_options.add_argument('--disable-extensions')
             chrome_options.add_argument('--disable-plugins')
             chrome_options.add_argument('--disable-images')  # Faster loading
+            chrome_options.add_argument('--enable-precise-memory-info')  # Unquantized performance.memory
+
+            # Keep timers running at full rate in windows that are not in front
+            chrome_options.add_argument('--disable-background-timer-throttling')
+            chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+            chrome_options.add_argument('--disable-renderer-backgrounding')
             chrome_options.add_argument(f'--window-size={self.config["window_size"][0]},{self.config["window_size"][1]}')
             chrome_options.add_argument(f'--user-agent={self.config["user_agent"]}')
 
@@ -110,40 +864,60 @@ class HeadlessTVDisplay:
             chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
             chrome_options.add_experimental_option('useAutomationExtension', False)
 
-            # Install and setup ChromeDriver automatically
-            service = Service(ChromeDriverManager().install())
+            if self.config.get('profile_dir'):
+                slot = self.profile_slot if profile_slot is None else profile_slot
+                profile = os.path.abspath(os.path.join(self.config['profile_dir'], f'slot{slot}'))
+                os.makedirs(profile, exist_ok=True)
+                chrome_options.add_argument(f'--user-data-dir={profile}')
+                chrome_options.add_argument('--no-first-run')
+                chrome_options.add_argument('--no-default-browser-check')
 
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            try:
+                driver = webdriver.Chrome(service=Service(self.resolve_chromedriver()), options=chrome_options)
+            except Exception as e:
+                if self.config.get('chromedriver_path'):
+                    raise
+                # The cached driver may no longer match an updated Chrome
+                self.logger.warning(f"Cached ChromeDriver failed ({e}), resolving again")
+                driver = webdriver.Chrome(service=Service(self.resolve_chromedriver(refresh=True)),
+                                          options=chrome_options)
             driver.set_page_load_timeout(60)
             driver.implicitly_wait(10)
 
-            self.logger.info("Chrome WebDriver created successfully")
+            self.last_driver_seconds = time.perf_counter() - started
+            self.logger.info(f"Chrome WebDriver created successfully in {self.last_driver_seconds:.1f}s")
             return driver
 
         except Exception as e:
             self.logger.error(f"Failed to create WebDriver: {e}")
             return None
 
-    def load_tv_display(self):
-        """Load the TV display page"""
+    def load_tv_display(self, driver=None, url=None):
+        """Load the TV display page (in a standby driver when one is given)"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
+        driver = driver or self.driver
+        url = url or self.config['url']
         try:
-            self.logger.info(f"Loading TV display: {self.config['url']}")
-            self.driver.get(self.config['url'])
+            self.logger.info(f"Loading TV display: {url}")
+            driver.get(url)
 
             # Wait for the page to load completely
-            WebDriverWait(self.driver, 30).until(
+            WebDriverWait(driver, 30).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
 
-            # Wait for JavaScript to initialize
-            time.sleep(10)
+            self.wait_until_ready(driver)
 
             # Check if the page loaded successfully
-            title = self.driver.title
+            title = driver.title
             self.logger.info(f"TV display loaded successfully. Title: {title}")
 
             # Execute JavaScript to ensure systems are initialized
-            self.driver.execute_script("""
+            driver.execute_script("""
                 console.log('Headless TV Display: Page loaded and JavaScript executing');
 
                 // Ensure all systems are initialized
@@ -167,183 +941,334 @@ class HeadlessTVDisplay:
             self.logger.error(f"Failed to load TV display: {e}")
             return False
 
-    def check_page_health(self):
-        """Check if the page is still responsive and functioning"""
+    def wait_until_ready(self, driver=None):
+        """Poll READY_SCRIPT until the page's JavaScript is initialized; False after ready_timeout"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+
+        driver = driver or self.driver
+        timeout = self.config.get('ready_timeout', READY_TIMEOUT)
         try:
-            # Check if the page is still loaded
-            current_url = self.driver.current_url
-            if not current_url.startswith('http'):
-                self.logger.warning("Page appears to be unloaded")
-                return False
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(self.READY_SCRIPT)
+            )
+            return True
+        except TimeoutException:
+            self.logger.warning(f"TV display JavaScript not ready after {timeout}s, continuing")
+            return False
 
-            # Execute a simple JavaScript check
-            result = self.driver.execute_script("""
-                return {
-                    url: window.location.href,
-                    title: document.title,
-                    readyState: document.readyState,
-                    timestamp: new Date().toISOString(),
-                    hasDataPersistence: typeof window.DataPersistence !== 'undefined',
-                    hasTabVisibilityManager: typeof window.TabVisibilityManager !== 'undefined',
-                    hasDrawSync: typeof window.DrawSync !== 'undefined'
-                };
-            """)
-
-            if result and result.get('readyState') == 'complete':
-                self.logger.debug(f"Page health check passed: {result}")
-                return True
-            else:
-                self.logger.warning(f"Page health check failed: {result}")
-                return False
+    def record_ready(self, phase, started):
+        """Log and keep the time from starting a browser to a ready display"""
+        elapsed = time.perf_counter() - started
+        self.ready_times.append({
+            'phase': phase,
+            'seconds': round(elapsed, 2),
+            'driver_seconds': round(self.last_driver_seconds or 0, 2),
+            'at': datetime.now().isoformat()
+        })
+        self.logger.info(f"⏱️ TV display ready after {phase} in {elapsed:.1f}s "
+                         f"(driver {self.last_driver_seconds or 0:.1f}s, page {elapsed - (self.last_driver_seconds or 0):.1f}s)")
+
+    def ready_summary(self):
+        """Time-to-ready per phase: count, last and worst seconds"""
+        summary = {}
+        for entry in self.ready_times:
+            phase = summary.setdefault(entry['phase'], {'count': 0, 'last': None, 'max': 0})
+            phase['count'] += 1
+            phase['last'] = entry['seconds']
+            phase['max'] = max(phase['max'], entry['seconds'])
+        return summary
+
+    def probe_page(self):
+        """Run the combined probe script; None if the page or driver is gone"""
+        from selenium.common.exceptions import WebDriverException
 
+        try:
+            return self.driver.execute_script(self.PROBE_SCRIPT)
         except WebDriverException as e:
-            self.logger.error(f"WebDriver error during health check: {e}")
-            return False
+            self.logger.error(f"WebDriver error during page probe: {e}")
+            return None
         except Exception as e:
-            self.logger.error(f"Unexpected error during health check: {e}")
+            self.logger.error(f"Unexpected error during page probe: {e}")
+            return None
+
+    def check_page_health(self, probe=None):
+        """Check if the page is still responsive and functioning"""
+        if probe is None:
+            probe = self.probe_page()
+
+        if not probe:
             return False
 
-    def get_draw_info(self):
-        """Get current draw information from the page with roulette-specific details"""
-        try:
-            result = self.driver.execute_script("""
-                return {
-                    currentDrawNumber: window.currentDrawNumber || 'unknown',
-                    rolledNumbersCount: window.rolledNumbersArray ? window.rolledNumbersArray.length : 0,
-                    lastUpdate: new Date().toISOString(),
-                    // Roulette-specific system status
-                    systems: {
-                        TabVisibilityManager: typeof window.TabVisibilityManager !== 'undefined',
-                        DrawNumberManager: typeof window.DrawNumberManager !== 'undefined',
-                        DataPersistence: typeof window.DataPersistence !== 'undefined',
-                        DrawSync: typeof window.DrawSync !== 'undefined'
-                    },
-                    // Additional roulette data
-                    allSpins: window.allSpins ? window.allSpins.slice(0, 5) : [],
-                    analytics: window.rouletteAnalytics || null,
-                    tabVisibilityState: window.TabVisibilityManager ?
-                        window.TabVisibilityManager.isVisible() : 'unknown'
-                };
-            """)
+        # Check if the page is still loaded
+        if not str(probe.get('url', '')).startswith('http'):
+            self.logger.warning("Page appears to be unloaded")
+            return False
+
+        if probe.get('readyState') == 'complete':
+            self.logger.debug(f"Page health check passed: {probe.get('url')} ({probe.get('title')})")
+            return True
+        else:
+            self.logger.warning(f"Page health check failed: readyState={probe.get('readyState')}")
+            return False
 
-            # Update system status tracking
-            if result and 'systems' in result:
-                self.system_status.update(result['systems'])
+    def get_draw_info(self, probe=None):
+        """Get current draw information from the page with roulette-specific details"""
+        if probe is None:
+            probe = self.probe_page()
 
-            return result
-        except Exception as e:
-            self.logger.error(f"Failed to get draw info: {e}")
+        if not probe:
+            self.logger.error("Failed to get draw info: page probe returned nothing")
             return None
 
-    def validate_roulette_systems(self):
+        # Update system status tracking
+        if 'systems' in probe:
+            self.system_status.update(probe['systems'])
+
+        if probe.get('allSpinsHash') != self.last_spins_hash:
+            self.logger.debug(f"Spin history changed: {probe.get('allSpinsCount', 0)} spins, "
+                              f"hash {probe.get('allSpinsHash')}")
+            self.last_spins_hash = probe.get('allSpinsHash')
+
+        return probe
+
+    def validate_roulette_systems(self, probe=None):
         """Validate that all roulette systems are properly loaded"""
-        try:
-            systems_check = self.driver.execute_script("""
-                const systems = {
-                    TabVisibilityManager: typeof window.TabVisibilityManager !== 'undefined',
-                    DrawNumberManager: typeof window.DrawNumberManager !== 'undefined',
-                    DataPersistence: typeof window.DataPersistence !== 'undefined',
-                    DrawSync: typeof window.DrawSync !== 'undefined'
-                };
+        if probe is None:
+            probe = self.probe_page()
 
-                const details = {};
+        if not probe or 'systems' not in probe:
+            self.logger.error("Failed to validate roulette systems: page probe returned nothing")
+            return False
 
-                // Check TabVisibilityManager
-                if (systems.TabVisibilityManager) {
-                    details.TabVisibilityManager = {
-                        isVisible: window.TabVisibilityManager.isVisible(),
-                        isCatchUpInProgress: window.TabVisibilityManager.isCatchUpInProgress()
-                    };
-                }
+        self.system_status.update(probe['systems'])
 
-                // Check DataPersistence
-                if (systems.DataPersistence) {
-                    details.DataPersistence = {
-                        isLoading: window.DataPersistence.state ? window.DataPersistence.state.isLoading : false,
-                        lastLoadTime: window.DataPersistence.state ? window.DataPersistence.state.lastLoadTime : null
-                    };
-                }
+        if not probe['allSystemsLoaded']:
+            missing_systems = [name for name, loaded in probe['systems'].items() if not loaded]
+            self.logger.warning(f"Missing roulette systems: {missing_systems}")
+            return False
 
-                return {
-                    systems: systems,
-                    details: details,
-                    allSystemsLoaded: Object.values(systems).every(loaded => loaded)
-                };
-            """)
+        self.logger.debug(f"Roulette system details: {probe.get('details')}")
+        self.logger.info("All roulette systems validated successfully")
+        return True
 
-            self.system_status.update(systems_check['systems'])
+    def time_draw_change(self, current_draw, seen_at=None, name=None):
+        """Feed a draw seen on a display to the latency probe; returns the latency in ms"""
+        if not self.latency_probe:
+            return None
 
-            if not systems_check['allSystemsLoaded']:
-                missing_systems = [name for name, loaded in systems_check['systems'].items() if not loaded]
-                self.logger.warning(f"Missing roulette systems: {missing_systems}")
-                return False
+        display = name or 'main'
+        latency_ms = self.latency_probe.observe(display, current_draw, seen_at or time.time())
+        if latency_ms is not None:
+            stats = self.latency_probe.stats(display)
+            prefix = f"[{name}] " if name else ""
+            self.logger.info(f"⏱️ {prefix}Draw {current_draw} on screen {latency_ms:.0f}ms after it was saved "
+                             f"(p50 {stats['p50']}ms, p95 {stats['p95']}ms, max {stats['max']}ms, "
+                             f"n={stats['count']})")
+        return latency_ms
 
-            self.logger.info("All roulette systems validated successfully")
-            return True
+    def detect_draw_sequence_gaps(self, current_draw):
+        """Detect gaps in the draw sequence; True when the page needs an emergency restart"""
+        gap = self.tracker.observe(current_draw)
+        return bool(gap) and self.gap_requires_restart(gap)
+
+    def gap_requires_restart(self, gap, name=None):
+        """Reconcile a gap with the backend and decide whether the page must be restarted"""
+        roulette = self.config['roulette_specific']
+        prefix = f"[{name}] " if name else ""
+
+        if not roulette.get('reconcile_gaps', True):
+            return roulette['emergency_restart_on_gap']
+
+        outcome = self.reconciler.reconcile(gap)
+        gap['reconciliation'] = outcome
+
+        if outcome['status'] == 'reconciled':
+            self.logger.warning(f"{prefix}Gap {gap['from']}->{gap['to']} reconciled: all {gap['gap_size']} "
+                                f"missed draws are stored, page has caught up")
+        elif outcome['status'] == 'missing':
+            self.logger.error(f"{prefix}Gap {gap['from']}->{gap['to']}: draws {outcome['not_stored']} "
+                              f"were never stored (backend sequence skip, restart will not help)")
+        elif outcome['status'] == 'unverified':
+            self.logger.warning(f"{prefix}Gap {gap['from']}->{gap['to']} could not be reconciled: "
+                                f"{outcome.get('error')}")
+        else:
+            self.logger.error(f"{prefix}Gap {gap['from']}->{gap['to']}: page disagrees with backend draw "
+                              f"{outcome['backend_current_draw']}")
+            if roulette['emergency_restart_on_gap']:
+                self.logger.error(f"{prefix}Emergency restart triggered due to unrecoverable page state")
+                return True
 
-        except Exception as e:
-            self.logger.error(f"Failed to validate roulette systems: {e}")
+        return False
+
+    def start_draw_watcher(self):
+        """Attach a DrawEventWatcher to the current driver when event mode is on"""
+        self.stop_draw_watcher()
+        if not self.config.get('event_mode', True):
             return False
 
-    def detect_draw_sequence_gaps(self, current_draw):
-        """Detect if there are gaps in the draw sequence"""
-        if not self.config['roulette_specific']['detect_sequence_gaps']:
+        self.draw_watcher = DrawEventWatcher(self.driver, self.draw_events, self.logger)
+        if not self.draw_watcher.start():
+            self.draw_watcher = None
             return False
+        return True
+
+    def stop_draw_watcher(self):
+        if self.draw_watcher:
+            self.draw_watcher.close()
+            self.draw_watcher = None
 
-        if self.last_draw_number is not None and current_draw != 'unknown':
+    def poll_interval(self):
+        """Seconds until the next full probe: a slow heartbeat while draw events flow"""
+        if self.draw_watcher and self.draw_watcher.connected:
+            return self.config.get('heartbeat_interval', 60)
+        return self.config['check_interval']
+
+    def wait_for_draw_events(self, timeout):
+        """Sleep up to timeout, handling pushed draw changes as they arrive
+
+        Returns False when a pushed change needs an emergency restart.
+        """
+        deadline = time.time() + timeout
+        while self.running:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
             try:
-                current_num = int(current_draw)
-                last_num = int(self.last_draw_number)
-
-                # Check for sequence gap
-                if current_num > last_num + 1:
-                    gap_size = current_num - last_num - 1
-                    gap_info = {
-                        'from': last_num,
-                        'to': current_num,
-                        'missing': list(range(last_num + 1, current_num)),
-                        'gap_size': gap_size,
-                        'timestamp': datetime.now().isoformat()
-                    }
-
-                    self.sequence_gaps_detected.append(gap_info)
-                    self.logger.error(f"🚨 DRAW SEQUENCE GAP DETECTED: {gap_info}")
-
-                    # Emergency restart if configured
-                    if self.config['roulette_specific']['emergency_restart_on_gap']:
-                        self.logger.error("Emergency restart triggered due to sequence gap")
-                        return True
-
-                # Update draw history
-                self.draw_history.append({
-                    'draw_number': current_num,
-                    'timestamp': datetime.now().isoformat()
-                })
+                event = self.draw_events.get(timeout=min(remaining, CONFIG_POLL_INTERVAL))
+            except queue.Empty:
+                # Cut a long heartbeat wait short so config edits apply promptly
+                if self.config_watcher and self.config_watcher.changed():
+                    break
+                continue
+
+            latency_ms = (event['received_at'] * 1000) - event.get('at', event['received_at'] * 1000)
+            self.logger.debug(f"Draw event ({event.get('reason')}, {latency_ms:.0f}ms): {event}")
+
+            current_draw = event.get('currentDrawNumber')
+            if current_draw is None or str(current_draw) == str(self.tracker.last_draw_number):
+                continue
+
+            self.logger.info(f"🎯 Draw change pushed: {self.tracker.last_draw_number} -> {current_draw} "
+                             f"(Spins: {event.get('rolledNumbersCount', 0)})")
+            self.time_draw_change(current_draw, event['at'] / 1000 if event.get('at') else event['received_at'])
+            if self.config['roulette_specific']['detect_sequence_gaps'] and \
+                    self.detect_draw_sequence_gaps(current_draw):
+                return False
+        return True
 
-                # Keep only last 20 draws in history
-                if len(self.draw_history) > 20:
-                    self.draw_history = self.draw_history[-20:]
+    def browser_rss_mb(self, driver=None):
+        """Resident memory of all Chrome processes under ChromeDriver, None without psutil"""
+        driver = driver or self.driver
+        if psutil is None or driver is None:
+            return None
+        try:
+            processes = psutil.Process(driver.service.process.pid).children(recursive=True)
+            return sum(process.memory_info().rss for process in processes) / MB
+        except (AttributeError, psutil.Error):
+            return None
 
-                self.last_draw_number = current_draw
+    def sample_memory(self, probe):
+        """Record this cycle's JS heap and browser RSS; returns (heap MB, RSS MB)"""
+        memory = (probe or {}).get('memory') or {}
+        heap_mb = memory['usedJSHeapSize'] / MB if memory.get('usedJSHeapSize') else None
+        rss_mb = self.browser_rss_mb()
+        if heap_mb is not None or rss_mb is not None:
+            self.memory_samples.append((time.time(), heap_mb, rss_mb))
+        return heap_mb, rss_mb
+
+    def heap_growth_mb_per_hour(self):
+        """Least-squares JS heap growth rate since the browser started, once enough samples span growth_window"""
+        samples = [(t, heap) for t, heap, _ in self.memory_samples if heap is not None]
+        window = self.config.get('recycle', {}).get('growth_window', 1800)
+        if len(samples) < 3 or samples[-1][0] - samples[0][0] < window:
+            return None
 
-            except (ValueError, TypeError):
-                self.logger.warning(f"Invalid draw number format: {current_draw}")
+        mean_t = sum(t for t, _ in samples) / len(samples)
+        mean_heap = sum(heap for _, heap in samples) / len(samples)
+        variance = sum((t - mean_t) ** 2 for t, _ in samples)
+        if not variance:
+            return None
+        slope = sum((t - mean_t) * (heap - mean_heap) for t, heap in samples) / variance
+        return slope * 3600
+
+    def recycle_reason(self, heap_mb, rss_mb):
+        """Why the browser should be recycled now, or None while it is healthy"""
+        policy = self.config.get('recycle', {})
+        age = (datetime.now() - self.last_restart).total_seconds()
+
+        if self.config.get('restart_interval') and age > self.config['restart_interval']:
+            return f"browser age {age:.0f}s exceeds restart_interval"
+        if heap_mb is not None and policy.get('max_js_heap_mb') and heap_mb > policy['max_js_heap_mb']:
+            return f"JS heap {heap_mb:.0f}MB exceeds {policy['max_js_heap_mb']}MB"
+        if rss_mb is not None and policy.get('max_rss_mb') and rss_mb > policy['max_rss_mb']:
+            return f"browser RSS {rss_mb:.0f}MB exceeds {policy['max_rss_mb']}MB"
+
+        growth = self.heap_growth_mb_per_hour()
+        if growth is not None and policy.get('max_heap_growth_mb_per_hour') and \
+                growth > policy['max_heap_growth_mb_per_hour']:
+            return f"JS heap growing {growth:.0f}MB/h (limit {policy['max_heap_growth_mb_per_hour']}MB/h)"
+        return None
+
+    def recycle_driver(self):
+        """Replace the browser with a fully loaded standby so the display never goes blank
+
+        Falls back to a cold restart_driver() if the standby cannot be started.
+        """
+        self.logger.info("Starting standby WebDriver for recycle...")
+        started = time.perf_counter()
+        standby_slot = 1 - self.profile_slot
+        standby = self.create_driver(profile_slot=standby_slot)
+        if standby and self.load_tv_display(standby):
+            try:
+                ready = standby.execute_script(self.PROBE_SCRIPT)
+            except Exception as e:
+                self.logger.error(f"Standby probe failed: {e}")
+                ready = None
+
+            if ready and ready.get('readyState') == 'complete':
+                old_driver = self.driver
+                self.stop_draw_watcher()
+                self.driver = standby
+                self.profile_slot = standby_slot
+                self.start_draw_watcher()
+                self.last_restart = datetime.now()
+                self.memory_samples.clear()
+                self.record_ready('recycle', started)
+
+                try:
+                    old_driver.quit()
+                except Exception:
+                    pass
+                self.logger.info("Swapped to standby WebDriver with no display downtime")
+                return True
 
-        return False
+        if standby:
+            try:
+                standby.quit()
+            except Exception:
+                pass
+        self.logger.warning("Standby WebDriver not ready, falling back to a cold restart")
+        return self.restart_driver()
 
     def restart_driver(self):
         """Restart the WebDriver to prevent memory leaks"""
         self.logger.info("Restarting WebDriver...")
 
+        self.stop_draw_watcher()
         if self.driver:
             try:
                 self.driver.quit()
             except:
                 pass
 
+        started = time.perf_counter()
         self.driver = self.create_driver()
         if self.driver and self.load_tv_display():
             self.last_restart = datetime.now()
+            self.memory_samples.clear()
+            self.start_draw_watcher()
+            self.record_ready('restart', started)
             self.logger.info("WebDriver restarted successfully")
             return True
         else:
@@ -356,6 +1281,7 @@ class HeadlessTVDisplay:
         self.running = True
 
         # Create initial driver
+        started = time.perf_counter()
         self.driver = self.create_driver()
         if not self.driver:
             self.logger.error("Failed to create initial WebDriver")
@@ -365,22 +1291,35 @@ class HeadlessTVDisplay:
         if not self.load_tv_display():
             self.logger.error("Failed to load initial TV display")
             return False
+        self.record_ready('boot', started)
+
+        self.start_draw_watcher()
 
         # Main monitoring loop
         while self.running:
             try:
-                # Check if it's time to restart (prevent memory leaks)
-                if datetime.now() - self.last_restart > timedelta(seconds=self.config['restart_interval']):
-                    if not self.restart_driver():
-                        break
+                changed = self.reload_config()
+                if 'event_mode' in changed:
+                    self.start_draw_watcher()
+                if 'url' in changed:
+                    self.stop_draw_watcher()
+                    if not self.load_tv_display():
+                        self.logger.error("Failed to load new TV display URL, restarting driver...")
+                        if not self.restart_driver():
+                            break
+                    self.start_draw_watcher()
+
+                # One probe round-trip feeds the health, system and draw checks below
+                probe = self.probe_page()
 
                 # Check page health
-                if not self.check_page_health():
+                if not self.check_page_health(probe):
                     self.logger.warning("Page health check failed, attempting to reload...")
                     if not self.load_tv_display():
                         self.logger.error("Failed to reload page, restarting driver...")
                         if not self.restart_driver():
                             break
+                    probe = self.probe_page()
 
                 # Validate roulette systems (every 5th check)
                 if self.config['roulette_specific']['validate_systems']:
@@ -388,14 +1327,17 @@ class HeadlessTVDisplay:
                     self._check_count = check_count
 
                     if check_count % 5 == 0:  # Every 5th check
-                        if not self.validate_roulette_systems():
+                        if not self.validate_roulette_systems(probe):
                             self.logger.warning("Roulette systems validation failed, restarting...")
                             if not self.restart_driver():
                                 break
+                            probe = self.probe_page()
 
                 # Get and log current draw information
-                draw_info = self.get_draw_info()
+                draw_info = self.get_draw_info(probe)
                 if draw_info:
+                    self.time_draw_change(draw_info.get('currentDrawNumber'))
+
                     # Check for draw sequence gaps
                     if self.config['roulette_specific']['detect_sequence_gaps']:
                         current_draw = draw_info.get('currentDrawNumber', 'unknown')
@@ -414,8 +1356,20 @@ class HeadlessTVDisplay:
                     # Log detailed info at debug level
                     self.logger.debug(f"Full draw info: {draw_info}")
 
-                # Wait before next check
-                time.sleep(self.config['check_interval'])
+                # Recycle the browser only when memory says so, swapping in a warm standby
+                heap_mb, rss_mb = self.sample_memory(probe)
+                self.logger.debug(f"Memory - JS heap: {heap_mb} MB, browser RSS: {rss_mb} MB")
+                reason = self.recycle_reason(heap_mb, rss_mb)
+                if reason:
+                    self.logger.warning(f"Recycling browser: {reason}")
+                    if not self.recycle_driver():
+                        break
+
+                # Wait before next check; pushed draw changes are handled as they arrive
+                if not self.wait_for_draw_events(self.poll_interval()):
+                    self.logger.error("Emergency restart triggered by pushed draw change")
+                    if not self.restart_driver():
+                        break
 
             except KeyboardInterrupt:
                 self.logger.info("Received keyboard interrupt")
@@ -436,13 +1390,347 @@ class HeadlessTVDisplay:
         uptime = datetime.now() - self.start_time
         self.logger.info(f"📊 ROULETTE SESSION SUMMARY:")
         self.logger.info(f"   Total uptime: {uptime}")
-        self.logger.info(f"   Last draw number: {self.last_draw_number}")
-        self.logger.info(f"   Draw history count: {len(self.draw_history)}")
-        self.logger.info(f"   Sequence gaps detected: {len(self.sequence_gaps_detected)}")
+        self.logger.info(f"   Last draw number: {self.tracker.last_draw_number}")
+        self.logger.info(f"   Draw history count: {len(self.tracker.draw_history)}")
+        self.logger.info(f"   Sequence gaps detected: {len(self.tracker.sequence_gaps_detected)} "
+                         f"({self.tracker.total_gaps} since the state file was created)")
         self.logger.info(f"   System status: {self.system_status}")
+        self.logger.info(f"   Time to ready: {self.ready_summary()}")
+        if self.latency_probe:
+            self.logger.info(f"   Draw propagation latency (ms): {self.latency_probe.summary()}")
+
+        if self.tracker.sequence_gaps_detected:
+            self.logger.warning(f"🚨 GAPS DETECTED DURING SESSION: {list(self.tracker.sequence_gaps_detected)}")
+        self.tracker.close()
+
+        self.stop_draw_watcher()
+        if self.driver:
+            try:
+                self.driver.quit()
+                self.logger.info("WebDriver closed successfully")
+            except Exception as e:
+                self.logger.error(f"Error closing WebDriver: {e}")
+
+class DisplayTab:
+    """One TV display page in the supervisor's shared browser"""
+
+    def __init__(self, name, url, tracker):
+        self.name = name
+        self.url = url
+        self.tracker = tracker
+        self.handle = None
+        self.watcher = None
+        self.events = None
+        self.check_count = 0
+        self.reloads = 0
+
+
+class AsyncEventSink:
+    """Queue-like put() for DrawEventWatcher threads that feeds an asyncio.Queue"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+
+class TVDisplaySupervisor(HeadlessTVDisplay):
+    """Run many TV display pages in one shared Chrome, monitored concurrently with asyncio
+
+    Each display from config['displays'] gets its own browser window (a
+    window rather than a background tab, so pages stay visible and their
+    timers are not throttled) and its own DrawTracker, draw event watcher
+    and reload policy. An extra display costs one renderer instead of a
+    Chrome and ChromeDriver of its own. WebDriver commands switch between
+    windows, so they are serialized on driver_lock; the waiting, event
+    handling and DevTools watchers run concurrently.
+    """
+
+    def __init__(self, config=None, config_watcher=None):
+        super().__init__(config, config_watcher)
+        self.driver_lock = None
+        self.restart_lock = None
+        self.browser_generation = 0
+        self.tabs = [
+            DisplayTab(display['name'], display['url'],
+                       DrawTracker(self.config['roulette_specific'], self.logger, display['name'],
+                                   self.display_state_file(display['name'])))
+            for display in self.config['displays']
+        ]
+
+    def create_tracker(self):
+        # Each display has its own tracker; don't map the single-display state_file
+        return None
+
+    def apply_config(self, config):
+        changed = super().apply_config(config)
+        for tab in self.tabs:
+            tab.tracker.config = config['roulette_specific']
+        return changed
+
+    async def watch_config(self):
+        """Apply config file edits; each display picks them up on its next check"""
+        while self.running and self.config_watcher:
+            changed = self.reload_config()
+            if 'event_mode' in changed:
+                for tab in self.tabs:
+                    await self.attach_watcher(tab)
+            await asyncio.sleep(CONFIG_POLL_INTERVAL)
+
+    def display_state_file(self, name):
+        """Per-display checkpoint next to the configured state_file (None keeps it in memory)"""
+        if not self.config.get('state_file', DEFAULT_STATE_FILE):
+            return None
+        root, ext = os.path.splitext(self.config.get('state_file', DEFAULT_STATE_FILE))
+        return f"{root}_{name}{ext}"
+
+    async def on_tab(self, tab, action):
+        """Run action(driver) with tab's window selected, in a worker thread"""
+        def run():
+            if self.driver.current_window_handle != tab.handle:
+                self.driver.switch_to.window(tab.handle)
+            return action(self.driver)
+
+        async with self.driver_lock:
+            return await asyncio.to_thread(run)
+
+    async def probe_tab(self, tab):
+        try:
+            return await self.on_tab(tab, lambda driver: driver.execute_script(self.PROBE_SCRIPT))
+        except Exception as e:
+            self.logger.error(f"[{tab.name}] Page probe failed: {e}")
+            return None
+
+    async def open_display(self, tab, first=False):
+        """Open a display window, load its page and attach its draw watcher"""
+        def open_window():
+            if not first:
+                self.driver.switch_to.new_window('window')
+            tab.handle = self.driver.current_window_handle
+            self.driver.get(tab.url)
+
+        self.logger.info(f"[{tab.name}] Loading TV display: {tab.url}")
+        started = time.perf_counter()
+        try:
+            async with self.driver_lock:
+                await asyncio.to_thread(open_window)
+        except Exception as e:
+            self.logger.error(f"[{tab.name}] Failed to open display: {e}")
+            return False
+
+        await self.wait_until_tab_ready(tab, started)
+        await self.attach_watcher(tab)
+        return True
+
+    async def wait_until_tab_ready(self, tab, started):
+        """Poll READY_SCRIPT between other displays' driver commands; False after ready_timeout"""
+        timeout = self.config.get('ready_timeout', READY_TIMEOUT)
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if await self.on_tab(tab, lambda driver: driver.execute_script(self.READY_SCRIPT)):
+                    self.logger.info(f"[{tab.name}] ⏱️ Page ready in {time.perf_counter() - started:.1f}s")
+                    return True
+            except Exception as e:
+                self.logger.debug(f"[{tab.name}] Readiness check failed: {e}")
+            await asyncio.sleep(0.25)
+
+        self.logger.warning(f"[{tab.name}] JavaScript not ready after {timeout}s, continuing")
+        return False
+
+    async def attach_watcher(self, tab):
+        if tab.watcher:
+            tab.watcher.close()
+            tab.watcher = None
+        if not self.config.get('event_mode', True):
+            return
+
+        tab.events = AsyncEventSink(asyncio.get_running_loop())
+        watcher = DrawEventWatcher(self.driver, tab.events, self.logger)
+        if await self.on_tab(tab, lambda driver: watcher.start()):
+            tab.watcher = watcher
+
+    async def reload_display(self, tab, reason):
+        """Reload one display's page; the other displays keep running"""
+        self.logger.warning(f"[{tab.name}] Reloading display: {reason}")
+        tab.reloads += 1
+        started = time.perf_counter()
+        try:
+            await self.on_tab(tab, lambda driver: driver.get(tab.url))
+        except Exception as e:
+            self.logger.error(f"[{tab.name}] Reload failed: {e}")
+            return False
 
-        if self.sequence_gaps_detected:
-            self.logger.warning(f"🚨 GAPS DETECTED DURING SESSION: {self.sequence_gaps_detected}")
+        await self.wait_until_tab_ready(tab, started)
+        return True
+
+    async def restart_browser(self, generation):
+        """Replace the shared browser and reopen every display, once per failure"""
+        async with self.restart_lock:
+            if generation != self.browser_generation:
+                return True  # Another display already restarted it
+
+            self.logger.warning("Restarting shared browser...")
+            started = time.perf_counter()
+            for tab in self.tabs:
+                if tab.watcher:
+                    tab.watcher.close()
+                    tab.watcher = None
+
+            async with self.driver_lock:
+                if self.driver:
+                    try:
+                        await asyncio.to_thread(self.driver.quit)
+                    except Exception:
+                        pass
+                self.driver = await asyncio.to_thread(self.create_driver)
+
+            if not self.driver:
+                self.logger.error("Failed to restart shared browser")
+                return False
+
+            self.browser_generation += 1
+            self.last_restart = datetime.now()
+            results = [await self.open_display(tab, first=(index == 0)) for index, tab in enumerate(self.tabs)]
+            self.record_ready('restart', started)
+            return all(results)
+
+    async def wait_for_tab_events(self, tab, timeout):
+        """Sleep up to timeout, handling this display's pushed draw changes; False if a reload is due"""
+        if not tab.watcher or not tab.watcher.connected:
+            await asyncio.sleep(timeout)
+            return True
+
+        deadline = time.time() + timeout
+        while self.running:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(tab.events.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+
+            current_draw = event.get('currentDrawNumber')
+            if current_draw is None or str(current_draw) == str(tab.tracker.last_draw_number):
+                continue
+
+            self.logger.info(f"🎯 [{tab.name}] Draw change pushed: {tab.tracker.last_draw_number} -> {current_draw}")
+            seen_at = event['at'] / 1000 if event.get('at') else event['received_at']
+            await asyncio.to_thread(self.time_draw_change, current_draw, seen_at, tab.name)
+            if await self.tab_gap_requires_reload(tab, current_draw):
+                return False
+        return True
+
+    async def tab_gap_requires_reload(self, tab, current_draw):
+        gap = tab.tracker.observe(current_draw)
+        return bool(gap) and await asyncio.to_thread(self.gap_requires_restart, gap, tab.name)
+
+    async def monitor_display(self, tab):
+        """Monitoring loop for one display"""
+        policy = self.config.get('recycle', {})
+
+        while self.running:
+            generation = self.browser_generation
+            probe = await self.probe_tab(tab)
+
+            if not self.check_page_health(probe):
+                if not await self.reload_display(tab, "page health check failed"):
+                    if not await self.restart_browser(generation):
+                        self.running = False
+                        break
+                continue
+
+            tab.check_count += 1
+            if self.config['roulette_specific']['validate_systems'] and tab.check_count % 5 == 0:
+                if not probe.get('allSystemsLoaded'):
+                    missing = [name for name, loaded in probe.get('systems', {}).items() if not loaded]
+                    await self.reload_display(tab, f"missing roulette systems {missing}")
+                    continue
+
+            current_draw = probe.get('currentDrawNumber', 'unknown')
+            await asyncio.to_thread(self.time_draw_change, current_draw, time.time(), tab.name)
+            if await self.tab_gap_requires_reload(tab, current_draw):
+                await self.reload_display(tab, "unrecoverable draw sequence gap")
+                continue
+
+            memory = probe.get('memory') or {}
+            heap_mb = memory['usedJSHeapSize'] / MB if memory.get('usedJSHeapSize') else None
+            status = (f"🎯 [{tab.name}] Draw: {current_draw}, "
+                      f"Spins: {probe.get('rolledNumbersCount', 0)}, "
+                      f"Systems: {sum(1 for loaded in probe.get('systems', {}).values() if loaded)}/4 loaded")
+            if heap_mb is not None:
+                status += f", Heap: {heap_mb:.0f}MB"
+            self.logger.info(status)
+
+            # A leaking page only costs its own renderer, so reload just that display
+            if heap_mb is not None and policy.get('max_js_heap_mb') and heap_mb > policy['max_js_heap_mb']:
+                await self.reload_display(tab, f"JS heap {heap_mb:.0f}MB exceeds {policy['max_js_heap_mb']}MB")
+                continue
+
+            interval = self.config.get('heartbeat_interval', 60) if tab.watcher and tab.watcher.connected \
+                else self.config['check_interval']
+            if not await self.wait_for_tab_events(tab, interval):
+                await self.reload_display(tab, "unrecoverable draw sequence gap")
+
+    async def watch_browser_age(self):
+        """Restart the shared browser once it passes restart_interval"""
+        while self.running and self.config.get('restart_interval'):
+            age = (datetime.now() - self.last_restart).total_seconds()
+            if age >= self.config['restart_interval']:
+                if not await self.restart_browser(self.browser_generation):
+                    self.running = False
+                    break
+                continue
+            await asyncio.sleep(min(self.config['restart_interval'] - age, 60))
+
+    async def supervise(self):
+        self.driver_lock = asyncio.Lock()
+        self.restart_lock = asyncio.Lock()
+
+        started = time.perf_counter()
+        self.driver = await asyncio.to_thread(self.create_driver)
+        if not self.driver:
+            self.logger.error("Failed to create shared WebDriver")
+            return False
+
+        for index, tab in enumerate(self.tabs):
+            await self.open_display(tab, first=(index == 0))
+        self.record_ready('boot', started)
+
+        await asyncio.gather(self.watch_browser_age(), self.watch_config(),
+                             *(self.monitor_display(tab) for tab in self.tabs))
+        return True
+
+    def run(self):
+        """Main execution loop"""
+        self.logger.info(f"Starting TV display supervisor for {len(self.tabs)} displays")
+        self.running = True
+        try:
+            return asyncio.run(self.supervise())
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop all displays and report per-display statistics"""
+        if not self.running and self.driver is None:
+            return
+        self.logger.info("Stopping TV display supervisor")
+        self.running = False
+
+        uptime = datetime.now() - self.start_time
+        self.logger.info(f"📊 SUPERVISOR SESSION SUMMARY (uptime {uptime}):")
+        self.logger.info(f"   Time to ready: {self.ready_summary()}")
+        if self.latency_probe:
+            self.logger.info(f"   Draw propagation latency (ms): {self.latency_probe.summary()}")
+        for tab in self.tabs:
+            self.logger.info(f"   [{tab.name}] Last draw: {tab.tracker.last_draw_number}, "
+                             f"gaps: {len(tab.tracker.sequence_gaps_detected)}, reloads: {tab.reloads}")
+            if tab.watcher:
+                tab.watcher.close()
+            tab.tracker.close()
 
         if self.driver:
             try:
@@ -450,13 +1738,220 @@ class HeadlessTVDisplay:
                 self.logger.info("WebDriver closed successfully")
             except Exception as e:
                 self.logger.error(f"Error closing WebDriver: {e}")
+            self.driver = None
+
+
+class BrowserlessTVEngine(HeadlessTVDisplay):
+    """Keep the TV's draw state ticking without a browser
+
+    Polls the endpoints the TV page's DrawSync/DataPersistence logic uses
+    and feeds the same DrawTracker, gap reconciliation and status logging
+    as the browser monitor, for shops where nobody watches the screen.
+    Requests carry If-None-Match/If-Modified-Since from the previous
+    response, and a body identical to the last one is not parsed again.
+    Runs in tens of megabytes: Selenium is never imported.
+    """
+
+    ENDPOINTS = {
+        'tv_sync': 'api/tv_sync.php',
+        'next_draw': 'php/get_next_draw_number.php',
+        'draw_info': 'api/safe_draw_advance.php?action=info'
+    }
+
+    def __init__(self, config=None, config_watcher=None):
+        super().__init__(config, config_watcher)
+        self.base_url = self.api_base_url()
+        self.timeout = self.config.get('request_timeout', 10)
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': self.config['user_agent'],
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        })
+
+        self.validators = {}
+        self.body_hashes = {}
+        self.responses = {}
+        self.endpoint_health = {
+            name: {'ok': False, 'failures': 0, 'last_ok': None, 'latency_ms': None, 'unchanged': 0}
+            for name in self.ENDPOINTS
+        }
+
+    @staticmethod
+    def draw_from(name, data):
+        """Current draw number reported by one endpoint's JSON, or None"""
+        if not isinstance(data, dict):
+            return None
+        if name == 'tv_sync':
+            return (data.get('data') or {}).get('current_draw') if data.get('status') == 'success' else None
+        if name == 'next_draw':
+            return data.get('current_draw_number') if data.get('status') == 'success' else None
+        return data.get('currentDraw') if data.get('success') else None
+
+    def fetch(self, name):
+        """Poll one endpoint; returns its latest JSON (reused when unchanged) or None on failure"""
+        health = self.endpoint_health[name]
+        headers = {}
+        validators = self.validators.get(name, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(urljoin(self.base_url, self.ENDPOINTS[name]),
+                                        headers=headers, timeout=self.timeout)
+            health['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+            if response.status_code == 304:
+                health['unchanged'] += 1
+                data = self.responses.get(name)
+            elif response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}")
+            else:
+                self.validators[name] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                digest = hashlib.sha1(response.content).digest()
+                if digest == self.body_hashes.get(name):
+                    health['unchanged'] += 1
+                    data = self.responses.get(name)
+                else:
+                    data = response.json()
+                    self.body_hashes[name] = digest
+                    self.responses[name] = data
+
+        except (requests.RequestException, ValueError) as e:
+            health['ok'] = False
+            health['failures'] += 1
+            self.logger.warning(f"Browserless poll of {self.ENDPOINTS[name]} failed: {e}")
+            return None
+
+        health['ok'] = True
+        health['failures'] = 0
+        health['last_ok'] = datetime.now().isoformat()
+        return data
+
+    def poll(self):
+        """Poll every endpoint once; returns the current draw and the draw each source reported"""
+        sources = {name: self.draw_from(name, self.fetch(name)) for name in self.ENDPOINTS}
+
+        # tv_sync is what the TV page itself displays; the others back it up
+        current_draw = next((sources[name] for name in ('tv_sync', 'draw_info', 'next_draw')
+                             if sources[name] is not None), None)
+        return current_draw, sources
+
+    def apply_config(self, config):
+        changed = super().apply_config(config)
+        if changed:
+            self.base_url = self.api_base_url()
+            self.timeout = config.get('request_timeout', 10)
+        return changed
+
+    def get_status(self):
+        """Health report in the shape of the browser monitor's status line"""
+        return {
+            'last_draw_number': self.tracker.last_draw_number,
+            'endpoints_ok': sum(1 for health in self.endpoint_health.values() if health['ok']),
+            'endpoints': self.endpoint_health,
+            'gaps_detected': len(self.tracker.sequence_gaps_detected),
+            'propagation_latency_ms': self.latency_probe.stats('main') if self.latency_probe else None,
+            'uptime_seconds': int((datetime.now() - self.start_time).total_seconds())
+        }
+
+    def run(self):
+        """Main execution loop"""
+        self.logger.info(f"Starting browserless TV engine against {self.base_url}")
+        self.running = True
+
+        while self.running:
+            try:
+                self.reload_config()
+                current_draw, sources = self.poll()
+                if current_draw is None:
+                    self.logger.warning(f"No endpoint reported a draw number: {sources}")
+                else:
+                    self.time_draw_change(current_draw)
+                    reported = {int(draw) for draw in sources.values() if draw is not None}
+                    if len(reported) > 1:
+                        self.logger.warning(f"Draw sources disagree: {sources}")
+
+                    if self.detect_draw_sequence_gaps(current_draw):
+                        # No page to restart: re-fetch everything so the next poll starts clean
+                        self.logger.error("Unrecoverable draw state, clearing cached endpoint state")
+                        self.validators.clear()
+                        self.body_hashes.clear()
+                        self.responses.clear()
+
+                status = self.get_status()
+                self.logger.info(f"🎯 Browserless Status - Draw: {current_draw if current_draw is not None else 'unknown'}, "
+                                 f"Endpoints: {status['endpoints_ok']}/{len(self.ENDPOINTS)} OK")
+                self.logger.debug(f"Full status: {status}")
+
+                time.sleep(self.config['check_interval'])
+
+            except KeyboardInterrupt:
+                self.logger.info("Received keyboard interrupt")
+                break
+            except Exception as e:
+                self.logger.error(f"Unexpected error in main loop: {e}")
+                time.sleep(10)  # Wait before retrying
+
+        self.stop()
+        return True
+
+    def stop(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+            super().stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the roulette TV display in a headless browser')
+    parser.add_argument('--display', action='append', default=[], metavar='NAME=URL',
+                        help='Monitor several displays in one browser (repeat per display)')
+    parser.add_argument('--browserless', action='store_true',
+                        help='Track draws by polling the PHP endpoints, without Chrome')
+    parser.add_argument('--config', default=CONFIG_FILE,
+                        help='Settings file, reloaded while running (default: headless_tv_config.json)')
+    parser.add_argument('--measure-latency', action='store_true',
+                        help='Report how long saved draws take to reach each display')
+    parser.add_argument('--test-backend', action='store_true',
+                        help='Measure latency against a local stub backend (tv_stub_server.py) instead of XAMPP')
+    parser.add_argument('--test-port', type=int, default=8799, help='Stub backend port (default: 8799)')
+    parser.add_argument('--test-draw-interval', type=float, default=10,
+                        help='Seconds between draws saved on the stub backend (default: 10)')
+    return parser.parse_args(argv)
+
 
 def main():
     """Main entry point for Roulette Headless TV Display"""
     config = {
         'url': 'http://localhost/slipp/tvdisplay/index.html',
-        'check_interval': 15,  # Check every 15 seconds for roulette system
-        'restart_interval': 7200,  # Restart every 2 hours for stability
+        'check_interval': 5,  # One batched probe per check, so poll often
+        'restart_interval': 86400,  # Hard cap on browser age; memory drives normal recycling
+        'recycle': {
+            'max_js_heap_mb': 512,  # Recycle when the page's JS heap passes this
+            'max_rss_mb': 2048,  # ...or Chrome's total RSS (needs psutil)
+            'max_heap_growth_mb_per_hour': 64,  # ...or the heap keeps growing this fast
+            'growth_window': 1800  # Seconds of samples before judging growth
+        },
+        'event_mode': True,  # Draw changes pushed over DevTools
+        'heartbeat_interval': 60,  # Full probe interval while events are flowing
+        'state_file': DEFAULT_STATE_FILE,  # Draw history checkpoint, survives restarts
+        'chromedriver_path': None,  # Fixed ChromeDriver binary; skips webdriver-manager entirely
+        'chromedriver_version': None,  # Pin webdriver-manager to this version (None = match Chrome)
+        'profile_dir': DEFAULT_PROFILE_DIR,  # Reused Chrome profile, keeps the HTTP cache warm
+        'ready_timeout': READY_TIMEOUT,  # Max seconds to wait for the page's JavaScript
+        'measure_latency': False,  # Time saved draw -> on screen per display (p50/p95/max)
+        'draw_time_offset': 0,  # Seconds to add to the database's draw_time to match this clock
+        # Several displays in one shared browser, e.g.
+        # [{'name': 'main', 'url': '.../tvdisplay/index.html'}, {'name': 'shop1', 'url': '.../tvdisplay/shop1.html'}]
+        'displays': [],
         'headless': True,  # Set to False for debugging
         'window_size': (1920, 1080),
         'user_agent': 'RouletteHeadlessTVDisplay/1.0',
@@ -465,17 +1960,62 @@ def main():
             'monitor_draw_numbers': True,
             'detect_sequence_gaps': True,
             'validate_systems': True,
-            'emergency_restart_on_gap': True
+            'reconcile_gaps': True,  # Check gaps against detailed_draw_results before restarting
+            'emergency_restart_on_gap': True  # Restart when the page state cannot be reconciled
         }
     }
 
-    simulator = HeadlessTVDisplay(config)
+    args = parse_args()
+    overrides = {}
+    displays = []
+    for display in args.display:
+        name, _, url = display.partition('=')
+        if not url or '://' in name:
+            name, url = f"display{len(displays) + 1}", display
+        displays.append({'name': name, 'url': url})
+    if displays:
+        overrides['displays'] = displays
+    if args.measure_latency:
+        overrides['measure_latency'] = True
+
+    backend = None
+    if args.test_backend:
+        from tv_stub_server import StubBackend
+
+        # Stub endpoints and TV page on localhost; the checkpoint stays in memory
+        backend = StubBackend(args.test_port, draw_interval=args.test_draw_interval).start()
+        overrides.update({
+            'url': backend.page_url,
+            'api_base_url': backend.base_url,
+            'displays': [{'name': display['name'], 'url': f"{backend.page_url}?display={display['name']}"}
+                         for display in displays],
+            'measure_latency': True,
+            'state_file': None
+        })
+
+    # headless_tv_config.json over the defaults above, watched for edits while running
+    watcher = ConfigWatcher(config, args.config, exclude=('keepalive',), overrides=overrides)
+    config = watcher.config
+
+    if args.browserless:
+        simulator = BrowserlessTVEngine(config, watcher)
+    elif config.get('displays'):
+        simulator = TVDisplaySupervisor(config, watcher)
+    else:
+        simulator = HeadlessTVDisplay(config, watcher)
+
+    if backend:
+        # Time each draw from the stub's save response, to the millisecond
+        backend.start_draws(on_saved=simulator.latency_probe.mark_saved)
 
     try:
         simulator.run()
     except Exception as e:
         logging.error(f"Fatal error: {e}")
         sys.exit(1)
+    finally:
+        if backend:
+            backend.stop()
 
 if __name__ == "__main__":
     main()
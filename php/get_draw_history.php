@@ -46,6 +46,39 @@ try {
         }
     }
 
+    // Range lookup for gap reconciliation (headless_tv_display.py):
+    // ?from=N&to=M returns only the stored results for draws N..M
+    if (isset($_GET['from'], $_GET['to'])) {
+        $from = max(1, intval($_GET['from']));
+        $to = min(intval($_GET['to']), $from + 999);
+        $draws = [];
+
+        if ($detailedDrawTableExists && $to >= $from) {
+            $stmt = $conn->prepare("
+                SELECT *
+                FROM detailed_draw_results
+                WHERE draw_number BETWEEN ? AND ?
+                ORDER BY draw_number
+            ");
+            $stmt->bind_param('ii', $from, $to);
+            $stmt->execute();
+            $result = $stmt->get_result();
+
+            while ($row = $result->fetch_assoc()) {
+                $draws[] = $row;
+            }
+        }
+
+        echo json_encode([
+            'status' => 'success',
+            'current_draw' => $current_draw_number,
+            'from' => $from,
+            'to' => $to,
+            'draws' => $draws
+        ]);
+        exit;
+    }
+
     // Fetch detailed draw results where available
     $completed_draws = [];
     if ($detailedDrawTableExists) {
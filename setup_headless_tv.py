@@ -25,7 +25,8 @@ class RouletteHeadlessSetup:
         self.requirements = [
             'selenium>=4.0.0',
             'webdriver-manager>=3.8.0',
-            'requests>=2.25.0'
+            'requests>=2.25.0',
+            'psutil>=5.8.0'
         ]
         
     def print_header(self):
@@ -111,7 +112,7 @@ class RouletteHeadlessSetup:
         test_urls = [
             'http://localhost/slipp/',
             'http://localhost/slipp/tvdisplay/index.html',
-            'http://localhost/slipp/api/get_next_draw_number.php'
+            'http://localhost/slipp/php/get_next_draw_number.php'
         ]
         
         for url in test_urls:
@@ -172,8 +173,24 @@ cd "{self.script_dir}"
         
         config = {
             "url": "http://localhost/slipp/tvdisplay/index.html",
-            "check_interval": 15,
-            "restart_interval": 7200,
+            "check_interval": 5,
+            "restart_interval": 86400,
+            "recycle": {
+                "max_js_heap_mb": 512,
+                "max_rss_mb": 2048,
+                "max_heap_growth_mb_per_hour": 64,
+                "growth_window": 1800
+            },
+            "event_mode": True,
+            "heartbeat_interval": 60,
+            "state_file": "headless_tv_state.bin",
+            "chromedriver_path": None,
+            "chromedriver_version": None,
+            "profile_dir": "headless_tv_profile",
+            "ready_timeout": 30,
+            "measure_latency": False,
+            "draw_time_offset": 0,
+            "displays": [],
             "headless": True,
             "window_size": [1920, 1080],
             "log_level": "INFO",
@@ -181,7 +198,30 @@ cd "{self.script_dir}"
                 "monitor_draw_numbers": True,
                 "detect_sequence_gaps": True,
                 "validate_systems": True,
+                "reconcile_gaps": True,
                 "emergency_restart_on_gap": True
+            },
+            "keepalive": {
+                "base_url": "http://localhost/slipp/",
+                "endpoints": [
+                    "php/get_next_draw_number.php",
+                    "api/safe_draw_advance.php?action=info",
+                    "api/tv_sync.php",
+                    "php/get_draw_history.php",
+                    "api/cashier_draw_sync.php"
+                ],
+                "ping_interval": 30,
+                "timeout": 10,
+                "endpoint_timeouts": {},
+                "max_concurrency": 8,
+                "histogram_file": "tv_keepalive_latency.bin",
+                "failure_threshold": 3,
+                "max_backoff": 300,
+                "fast_interval": 2,
+                "fast_window": 10,
+                "status_interval": 300,
+                "load_workers": 64,
+                "log_level": "INFO"
             }
         }
         
@@ -241,12 +281,12 @@ cd "{self.script_dir}"
         
         print("\n3. Verify operation:")
         print("   • Look for 'TV display loaded successfully' message")
-        print("   • Check draw number updates every 15 seconds")
+        print("   • Check draw number updates every 5 seconds")
         print("   • Close your browser - system continues running!")
         
         print("\n4. Configuration:")
         print("   • Edit: headless_tv_config.json")
-        print("   • Restart the script to apply changes")
+        print("   • Changes apply while running, no restart needed")
         
         print("\n🎯 BENEFITS:")
         print("   ✅ No more idle tab issues")
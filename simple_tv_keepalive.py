@@ -7,35 +7,509 @@ to keep the system active without running a full browser.
 
 This is useful if you just need to keep the backend systems active.
 
+Endpoints are pinged concurrently from a small thread pool over one
+keep-alive connection pool, so a cycle takes as long as the slowest
+endpoint rather than the sum of all of them, and each endpoint has its
+own deadline (endpoint_timeouts, falling back to timeout).
+
+Every ping's latency goes into a per-endpoint LatencyHistogram, and
+get_system_status reports p50/p90/p99/max per endpoint over the last
+hour. The histograms are saved to tv_keepalive_latency.bin whenever a new
+5-minute window starts and at shutdown, so the window survives restarts.
+
+Each endpoint is scheduled on its own (EndpointSchedule): a failing
+endpoint backs off exponentially with jitter, and after failure_threshold
+failures its circuit breaker opens, so a stalled backend is not hammered.
+Endpoints that report the draw number are probed every fast_interval
+seconds around the next expected draw change (DrawClock) and at
+ping_interval otherwise.
+
+Settings are read from the "keepalive" section of headless_tv_config.json
+and re-read whenever the file changes, so the ping interval, timeout and
+endpoint list can be tuned without restarting.
+
+Pings are conditional: ETag / Last-Modified validators are sent back as
+If-None-Match / If-Modified-Since, and compressed responses are accepted.
+When the backend ignores the validators (the PHP endpoints do), a body
+whose hash matches the previous one is not parsed again. Callbacks added
+with add_change_listener are called only when an endpoint's data really
+changed, ignoring fields such as timestamps that differ on every response.
+
+With --load it becomes a load generator instead (LoadGenerator): N
+virtual TV displays and M cashiers poll the same endpoints at the request
+mix in load_mix, as an open-loop Poisson arrival process, so a slow
+backend does not slow the offered load down. It reports throughput and
+latency percentiles per endpoint; --stub runs it against the bundled
+tv_stub_server.
+
 Requirements:
     pip install requests
 
 Usage:
     python simple_tv_keepalive.py
+    python simple_tv_keepalive.py --load --tvs 20 --cashiers 40 --duration 120
+    python simple_tv_keepalive.py --load --stub --stub-latency-ms 20 --output load.json
 """
 
+import os
+import math
 import time
+import random
+import struct
 import requests
 import logging
 import signal
 import sys
 import json
+import heapq
+import hashlib
+import argparse
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+
+from tv_config import CONFIG_FILE, ConfigWatcher, changed_keys
+
+HISTOGRAM_FILE = 'tv_keepalive_latency.bin'
+HISTOGRAM_WINDOWS = 12  # Rolling window of 12 x 5 minutes
+HISTOGRAM_WINDOW_SECONDS = 300
+# Response fields that differ on every request and say nothing about the draw state
+VOLATILE_KEYS = frozenset({'timestamp', 'server_time', 'system_time', 'countdown', 'message'})
+
+# Requests per second per virtual client, roughly what the browser pages poll
+LOAD_MIX = {
+    'tv': {
+        'api/tv_sync.php': 1.0,
+        'php/get_next_draw_number.php': 0.2,
+        'api/safe_draw_advance.php?action=info': 0.1,
+        'php/get_draw_history.php': 0.05
+    },
+    'cashier': {
+        'api/cashier_draw_sync.php': 0.33,
+        'php/get_next_draw_number.php': 0.2,
+        'api/tv_sync.php': 0.2
+    }
+}
+
+
+class LatencyHistogram:
+    """Rolling latency histogram for one endpoint, in fixed arrays of counters
+
+    Buckets are log-linear like HdrHistogram: values below 32us are exact,
+    and every power of two above that is split into 16 linear buckets, so
+    a reported percentile is within 1/16 (about 6%) of the true latency up
+    to about 268 seconds. Recording a sample is index arithmetic and a
+    counter increment in preallocated arrays.
+
+    Counts are kept per time window in a ring of `windows` slots; a slot is
+    cleared when its window comes round again, and percentiles cover the
+    windows still inside windows * window_seconds.
+    """
+
+    SUB_BUCKETS = 16
+    BUCKETS = 400  # 32 exact buckets + 23 powers of two x 16; slower samples land in the last one
+    ZEROS = array('I', bytes(4 * BUCKETS))
+
+    def __init__(self, windows=HISTOGRAM_WINDOWS, window_seconds=HISTOGRAM_WINDOW_SECONDS):
+        self.windows = windows
+        self.window_seconds = window_seconds
+        self.counts = array('I', bytes(4 * windows * self.BUCKETS))
+        self.maxima = array('Q', bytes(8 * windows))  # Slowest sample per window, in us
+        self.starts = array('q', bytes(8 * windows))  # Window start per slot, unix seconds
+
+    @classmethod
+    def bucket_index(cls, micros):
+        if micros < 2 * cls.SUB_BUCKETS:
+            return max(micros, 0)
+        shift = micros.bit_length() - 5
+        index = 2 * cls.SUB_BUCKETS + (shift - 1) * cls.SUB_BUCKETS + (micros >> shift) - cls.SUB_BUCKETS
+        return min(index, cls.BUCKETS - 1)
+
+    @classmethod
+    def bucket_ceiling(cls, index):
+        """Largest value (us) that falls in a bucket"""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        shift = (index - 2 * cls.SUB_BUCKETS) // cls.SUB_BUCKETS + 1
+        sub_bucket = (index - 2 * cls.SUB_BUCKETS) % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((sub_bucket + 1) << shift) - 1
+
+    def slot(self, now):
+        """Ring slot for the window containing now, cleared if it held an older window"""
+        window = int(now // self.window_seconds)
+        slot = window % self.windows
+        start = window * self.window_seconds
+        if self.starts[slot] != start:
+            offset = slot * self.BUCKETS
+            self.counts[offset:offset + self.BUCKETS] = self.ZEROS
+            self.maxima[slot] = 0
+            self.starts[slot] = start
+        return slot
+
+    def record(self, seconds, now=None):
+        micros = int(seconds * 1000000)
+        slot = self.slot(now or time.time())
+        self.counts[slot * self.BUCKETS + self.bucket_index(micros)] += 1
+        if micros > self.maxima[slot]:
+            self.maxima[slot] = micros
+
+    def percentiles(self, percents=(50, 90, 99), now=None):
+        """Nearest-rank percentiles and max in ms over the live windows"""
+        oldest = (now or time.time()) - self.windows * self.window_seconds
+        live = [slot for slot in range(self.windows) if self.starts[slot] and self.starts[slot] > oldest]
+
+        totals = [0] * self.BUCKETS
+        for slot in live:
+            offset = slot * self.BUCKETS
+            for index, count in enumerate(self.counts[offset:offset + self.BUCKETS]):
+                if count:
+                    totals[index] += count
+        count = sum(totals)
+        if not count:
+            return {'count': 0}
+
+        # Bucket ceilings overstate by up to a bucket width; never report past the true max
+        maximum = max(self.maxima[slot] for slot in live)
+        result = {'count': count}
+        for percent in percents:
+            target = max(1, math.ceil(percent / 100 * count))
+            seen = 0
+            for index, bucket_count in enumerate(totals):
+                seen += bucket_count
+                if seen >= target:
+                    result[f'p{percent}'] = round(min(self.bucket_ceiling(index), maximum) / 1000, 1)
+                    break
+        result['max'] = round(maximum / 1000, 1)
+        return result
+
+
+def comparable(data):
+    """Response data without its VOLATILE_KEYS, for deciding whether state changed"""
+    if isinstance(data, dict):
+        return {key: comparable(value) for key, value in data.items() if key not in VOLATILE_KEYS}
+    if isinstance(data, list):
+        return [comparable(value) for value in data]
+    return data
+
+
+def draw_number_from(data):
+    """Current draw number from a tv_sync, get_next_draw_number or safe_draw_advance response"""
+    if not isinstance(data, dict):
+        return None
+    inner = data.get('data') if isinstance(data.get('data'), dict) else {}
+    for value in (inner.get('current_draw'), data.get('current_draw_number'), data.get('currentDraw')):
+        try:
+            if value is not None:
+                return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class DrawClock:
+    """Predict when the draw number will next change
+
+    Uses tv_sync's countdown once it is seen to move (api/tv_sync.php
+    currently always reports 60), otherwise the median time between the
+    draw changes seen so far. Change times are when a ping noticed them,
+    so the estimate sharpens as the fast probing around each change runs.
+    """
+
+    def __init__(self, history=10):
+        self.draw_number = None
+        self.changes = deque(maxlen=history)
+        self.countdown = None
+        self.countdown_at = None
+        self.countdown_live = False
+
+    def observe(self, draw_number, countdown=None, now=None):
+        """Feed one response; True when it shows a new draw"""
+        now = now or time.time()
+        if countdown is not None:
+            if self.countdown is not None and countdown != self.countdown:
+                self.countdown_live = True
+            self.countdown, self.countdown_at = countdown, now
+
+        if draw_number is None or (self.draw_number is not None and draw_number <= self.draw_number):
+            return False
+        changed = self.draw_number is not None
+        if changed:
+            self.changes.append(now)
+        self.draw_number = draw_number
+        return changed
+
+    def period(self):
+        intervals = sorted(b - a for a, b in zip(self.changes, list(self.changes)[1:]))
+        return intervals[len(intervals) // 2] if intervals else None
+
+    def expected_change(self):
+        """Unix time of the next draw change, None until there is enough to go on"""
+        if self.countdown_live:
+            return self.countdown_at + self.countdown
+        period = self.period()
+        return self.changes[-1] + period if period else None
+
+
+class EndpointSchedule:
+    """When to ping one endpoint next: backoff with jitter behind a circuit breaker
+
+        closed      pinged on schedule
+        open        failure_threshold failures in a row; no requests until the
+                    jittered exponential backoff (capped at max_backoff) has passed
+        half_open   one trial ping after the backoff: success closes the
+                    breaker, failure reopens it with a longer backoff
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.state = 'closed'
+        self.failures = 0
+        self.next_due = 0.0
+        self.reports_draw = False
+
+    def due(self, now):
+        if now < self.next_due:
+            return False
+        if self.state == 'open':
+            self.state = 'half_open'
+        return True
+
+    def backoff(self, config):
+        """Exponential delay after the current run of failures, with equal jitter"""
+        delay = min(config.get('max_backoff', 300), config['ping_interval'] * 2 ** (self.failures - 1))
+        return random.uniform(delay / 2, delay)
+
+    def record(self, success, interval, config, now):
+        """Schedule the next ping after a result; returns the breaker state"""
+        if success:
+            self.state = 'closed'
+            self.failures = 0
+            self.next_due = now + interval
+        else:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= config.get('failure_threshold', 3):
+                self.state = 'open'
+            self.next_due = now + self.backoff(config)
+        return self.state
+
+
+# tv_keepalive_latency.bin: header, then per endpoint a length-prefixed
+# name and its starts, maxima and counts arrays (native byte order)
+HISTOGRAM_HEADER = struct.Struct('<4sHHHI')  # magic, endpoint count, windows, buckets, window seconds
+HISTOGRAM_MAGIC = b'TVLH'
+
+
+def save_histograms(path, histograms):
+    """Write all endpoint histograms to path, replacing it atomically"""
+    if not histograms:
+        return
+    sample = next(iter(histograms.values()))
+    parts = [HISTOGRAM_HEADER.pack(HISTOGRAM_MAGIC, len(histograms), sample.windows,
+                                   LatencyHistogram.BUCKETS, sample.window_seconds)]
+    for endpoint, histogram in histograms.items():
+        name = endpoint.encode('utf-8')
+        parts += [struct.pack('<H', len(name)), name, histogram.starts.tobytes(),
+                  histogram.maxima.tobytes(), histogram.counts.tobytes()]
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(b''.join(parts))
+    os.replace(temp_path, path)
+
+
+def load_histograms(path, windows=HISTOGRAM_WINDOWS, window_seconds=HISTOGRAM_WINDOW_SECONDS):
+    """Histograms saved by save_histograms; {} if missing or written with another layout"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, endpoints, stored_windows, buckets, stored_seconds = HISTOGRAM_HEADER.unpack_from(data, 0)
+    except (OSError, struct.error):
+        return {}
+    if (magic, stored_windows, buckets, stored_seconds) != \
+            (HISTOGRAM_MAGIC, windows, LatencyHistogram.BUCKETS, window_seconds):
+        return {}
+
+    histograms = {}
+    offset = HISTOGRAM_HEADER.size
+    try:
+        for _ in range(endpoints):
+            (length,) = struct.unpack_from('<H', data, offset)
+            offset += 2
+            name = data[offset:offset + length].decode('utf-8')
+            offset += length
+
+            histogram = LatencyHistogram(windows, window_seconds)
+            for values in (histogram.starts, histogram.maxima, histogram.counts):
+                size = len(values) * values.itemsize
+                values[:] = array(values.typecode, data[offset:offset + size])
+                offset += size
+            histograms[name] = histogram
+    except (struct.error, ValueError, UnicodeDecodeError):
+        return {}
+    return histograms
+
+class LoadGenerator:
+    """Open-loop load from virtual TV displays and cashiers
+
+    Every (client type, endpoint) pair in the mix is a Poisson stream at
+    clients x rate requests per second. One scheduler thread hands each
+    arrival to the worker pool at its scheduled time without waiting for
+    earlier responses, so the offered load stays fixed however slow the
+    backend gets. Latency is measured from the scheduled time, so time a
+    request spent waiting for a free worker counts against the backend
+    instead of silently lowering the load. Past max_outstanding queued
+    requests further arrivals are dropped and counted.
+    """
+
+    def __init__(self, config, clients, duration=60, scale=1.0, logger=None):
+        self.config = config
+        self.duration = duration
+        self.logger = logger or logging.getLogger(__name__)
+        mix = config.get('load_mix', LOAD_MIX)
+        self.streams = [(kind, endpoint, count * rate * scale)
+                        for kind, count in clients.items() if count
+                        for endpoint, rate in mix.get(kind, {}).items() if rate > 0]
+        self.endpoints = sorted({endpoint for _, endpoint, _ in self.streams})
+
+        self.lock = threading.Lock()
+        self.counts = {endpoint: {'sent': 0, 'ok': 0, 'errors': 0, 'dropped': 0} for endpoint in self.endpoints}
+        self.latency = {endpoint: LatencyHistogram(windows=1) for endpoint in self.endpoints}
+        self.outstanding = 0
+        self.peak_outstanding = 0
+        self.started_at = None
+
+        workers = config.get('load_workers', 64)
+        self.max_outstanding = config.get('max_outstanding', workers * 50)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tv-load')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': 'TVLoadGenerator/1.0', 'Cache-Control': 'no-cache'})
+
+    def request(self, endpoint, scheduled):
+        """One request, timed from when it was scheduled to go out"""
+        try:
+            response = self.session.get(urljoin(self.config['base_url'], endpoint), timeout=self.config['timeout'])
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - scheduled
+
+        with self.lock:
+            self.outstanding -= 1
+            self.counts[endpoint]['ok' if ok else 'errors'] += 1
+            self.latency[endpoint].record(elapsed, now=self.started_at)
+
+    def arrivals(self, started):
+        """(time, endpoint) for every arrival until the run ends, in time order"""
+        heap = [(started + random.expovariate(rate), index) for index, (_, _, rate) in enumerate(self.streams)]
+        heapq.heapify(heap)
+        end = started + self.duration
+        while heap and heap[0][0] < end:
+            at, index = heapq.heappop(heap)
+            yield at, self.streams[index][1]
+            heapq.heappush(heap, (at + random.expovariate(self.streams[index][2]), index))
+
+    def run(self):
+        """Generate load for the configured duration and return the report"""
+        offered = sum(rate for _, _, rate in self.streams)
+        self.logger.info(f"Offering {offered:.1f} req/s to {self.config['base_url']} for {self.duration}s "
+                         f"across {len(self.endpoints)} endpoints")
+        self.started_at = time.time()
+        started = time.perf_counter()
+
+        try:
+            for at, endpoint in self.arrivals(started):
+                delay = at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                with self.lock:
+                    if self.outstanding >= self.max_outstanding:
+                        self.counts[endpoint]['dropped'] += 1
+                        continue
+                    self.outstanding += 1
+                    self.peak_outstanding = max(self.peak_outstanding, self.outstanding)
+                    self.counts[endpoint]['sent'] += 1
+                self.executor.submit(self.request, endpoint, at)
+
+            # The last arrival falls short of the end; the window is the full duration
+            remaining = started + self.duration - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+        except KeyboardInterrupt:
+            self.logger.info("Load run interrupted, waiting for requests in flight")
+        finally:
+            # Let the requests in flight finish (or time out) so every one is counted
+            self.executor.shutdown(wait=True)
+            self.session.close()
+
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        """Per-endpoint throughput and latency percentiles (ms) for the run
+
+        Offered (arrivals) and completed rates are both per second of the
+        same window: the run plus the drain of requests still in flight.
+        """
+        endpoints = {}
+        for endpoint in self.endpoints:
+            counts = self.counts[endpoint]
+            latency = self.latency[endpoint].percentiles(now=self.started_at)
+            endpoints[endpoint] = dict(counts, throughput_rps=round(counts['ok'] / elapsed, 2),
+                                       **{key: value for key, value in latency.items() if key != 'count'})
+        totals = {key: sum(counts[key] for counts in self.counts.values())
+                  for key in ('sent', 'ok', 'errors', 'dropped')}
+        return {
+            'base_url': self.config['base_url'],
+            'duration_seconds': round(elapsed, 1),
+            'target_rps': round(sum(rate for _, _, rate in self.streams), 2),
+            'offered_rps': round((totals['sent'] + totals['dropped']) / elapsed, 2),
+            'throughput_rps': round(totals['ok'] / elapsed, 2),
+            'peak_outstanding': self.peak_outstanding,
+            'totals': totals,
+            'endpoints': endpoints
+        }
+
+    def log_report(self, report):
+        self.logger.info(f"{'Endpoint':<42} {'sent':>7} {'ok':>7} {'err':>5} {'drop':>5} "
+                         f"{'req/s':>7} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}")
+        for endpoint, row in report['endpoints'].items():
+            self.logger.info(f"{endpoint:<42} {row['sent']:>7} {row['ok']:>7} {row['errors']:>5} "
+                             f"{row['dropped']:>5} {row['throughput_rps']:>7} {row.get('p50', '-'):>7} "
+                             f"{row.get('p90', '-'):>7} {row.get('p99', '-'):>7} {row.get('max', '-'):>7}")
+        self.logger.info(f"Offered {report['offered_rps']} req/s (target {report['target_rps']}), "
+                         f"completed {report['throughput_rps']} req/s "
+                         f"over {report['duration_seconds']}s; {report['totals']['errors']} errors, "
+                         f"{report['totals']['dropped']} dropped, peak {report['peak_outstanding']} outstanding "
+                         f"(latencies in ms)")
+
 
 class TVKeepAlive:
-    def __init__(self, config=None):
+    def __init__(self, config=None, config_watcher=None):
         """Initialize the TV keep-alive system"""
+        self.config_watcher = config_watcher
         self.config = config or {
             'base_url': 'http://localhost/slipp/',
             'endpoints': [
-                'api/get_next_draw_number.php',
+                'php/get_next_draw_number.php',
                 'api/safe_draw_advance.php?action=info',
                 'api/tv_sync.php',
                 'php/get_draw_history.php'
             ],
             'ping_interval': 30,  # Ping every 30 seconds
             'timeout': 10,  # Request timeout
+            'max_concurrency': 8,  # Endpoints pinged at once
+            'histogram_file': HISTOGRAM_FILE,  # Latency histograms, kept across restarts
+            'failure_threshold': 3,  # Consecutive failures before an endpoint's circuit opens
+            'max_backoff': 300,  # Longest wait between retries of a failing endpoint
+            'fast_interval': 2,  # Draw endpoints' ping interval around an expected draw change
+            'fast_window': 10,
+            'status_interval': 300,
             'log_level': logging.INFO
         }
         
@@ -48,6 +522,27 @@ class TVKeepAlive:
             'last_success': None,
             'last_failure': None
         }
+        self.stats_lock = threading.Lock()
+        self.latency = load_histograms(self.config.get('histogram_file', HISTOGRAM_FILE))
+        self.schedules = {}
+        self.draw_clock = DrawClock()
+        self.validators = {}
+        self.body_hashes = {}
+        self.responses = {}
+        self.change_listeners = []
+        self.last_status_log = time.time()
+        self.saved_window = int(time.time() // HISTOGRAM_WINDOW_SECONDS)
+
+        # One pooled session shared by the ping threads; connections stay open between cycles
+        self.session = requests.Session()
+        self.executor = None
+        self.size_pool(self.config.get('max_concurrency', 8))
+        self.session.headers.update({
+            'User-Agent': 'TVKeepAlive/1.0',
+            'Accept-Encoding': 'gzip, deflate',
+            'Cache-Control': 'no-cache',
+            'Pragma': 'no-cache'
+        })
         
         # Setup logging
         logging.basicConfig(
@@ -70,89 +565,279 @@ class TVKeepAlive:
         self.stop()
         sys.exit(0)
     
+    def size_pool(self, workers):
+        """(Re)create the ping threads and a connection pool to match them"""
+        previous = self.executor
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tv-ping')
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if previous:
+            # Pings past their deadline finish on the old threads
+            previous.shutdown(wait=False)
+
+    def reload_config(self):
+        """Apply edits to the config file, if any, before the next ping cycle"""
+        if not self.config_watcher:
+            return
+        config = self.config_watcher.poll()
+        if config is None:
+            return
+
+        changed = changed_keys(self.config, config)
+        self.config = config
+        logging.getLogger().setLevel(config['log_level'])
+        if 'max_concurrency' in changed:
+            self.size_pool(config.get('max_concurrency', 8))
+            self.logger.info(f"Ping pool resized to {config.get('max_concurrency', 8)} threads")
+        # Forget the circuits of endpoints that were removed
+        for endpoint in set(self.schedules) - set(config['endpoints']):
+            del self.schedules[endpoint]
+        if changed:
+            self.logger.info(f"Configuration reloaded, changed: {', '.join(changed)}")
+
+    def record_result(self, endpoint, success, elapsed=None):
+        """Count one ping and its latency; called from the ping threads"""
+        with self.stats_lock:
+            if elapsed is not None:
+                histogram = self.latency.get(endpoint)
+                if histogram is None:
+                    histogram = self.latency[endpoint] = LatencyHistogram()
+                histogram.record(elapsed)
+
+            self.stats['total_requests'] += 1
+            if success:
+                self.stats['successful_requests'] += 1
+                self.stats['last_success'] = datetime.now()
+            else:
+                self.stats['failed_requests'] += 1
+                self.stats['last_failure'] = datetime.now()
+
+    def endpoint_timeout(self, endpoint):
+        """Deadline in seconds for one endpoint"""
+        return self.config.get('endpoint_timeouts', {}).get(endpoint, self.config['timeout'])
+
+    def add_change_listener(self, callback, endpoints=None):
+        """Call callback(endpoint, data, previous) whenever an endpoint's data changes
+
+        previous is None for an endpoint's first response. endpoints limits
+        the callback to those endpoints. Callbacks run on the ping loop's
+        thread, after each ping cycle.
+        """
+        self.change_listeners.append((callback, set(endpoints) if endpoints else None))
+
+    def notify_changes(self, results):
+        for endpoint, result in results.items():
+            if not result.get('changed'):
+                continue
+            for callback, endpoints in self.change_listeners:
+                if endpoints is None or endpoint in endpoints:
+                    try:
+                        callback(endpoint, result['data'], result['previous'])
+                    except Exception as e:
+                        self.logger.error(f"Change listener failed for {endpoint}: {e}")
+
     def ping_endpoint(self, endpoint):
-        """Ping a specific endpoint"""
+        """Ping a specific endpoint
+
+        Returns (success, data, changed, previous data). An unchanged
+        response (304, or the same body as last time) returns the data
+        parsed earlier without parsing it again.
+        """
         url = urljoin(self.config['base_url'], endpoint)
+        headers = {}
+        validators = self.validators.get(endpoint, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        previous = self.responses.get(endpoint)
         
+        started = time.perf_counter()
         try:
             self.logger.debug(f"Pinging: {url}")
             
-            response = requests.get(
-                url,
-                timeout=self.config['timeout'],
-                headers={
-                    'User-Agent': 'TVKeepAlive/1.0',
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache'
-                }
-            )
-            
-            self.stats['total_requests'] += 1
+            response = self.session.get(url, headers=headers, timeout=self.endpoint_timeout(endpoint))
+            if response.status_code == 304 and endpoint not in self.responses:
+                # Nothing cached to reuse (e.g. a server that answers 304 regardless); ask once for the body
+                self.validators.pop(endpoint, None)
+                response = self.session.get(url, timeout=self.endpoint_timeout(endpoint))
+            elapsed = time.perf_counter() - started
             
+            if response.status_code == 304:
+                # The endpoint answered, so it is healthy even without a body to show
+                self.record_result(endpoint, True, elapsed)
+                self.logger.debug(f"Not modified: {endpoint}")
+                return True, previous, False, previous
+
             if response.status_code == 200:
-                self.stats['successful_requests'] += 1
-                self.stats['last_success'] = datetime.now()
+                self.record_result(endpoint, True, elapsed)
+                self.validators[endpoint] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+
+                # The PHP endpoints send no validators; an identical body needs no parsing
+                digest = hashlib.sha1(response.content).digest()
+                if digest == self.body_hashes.get(endpoint):
+                    self.logger.debug(f"Unchanged response from {endpoint}")
+                    return True, previous, False, previous
                 
                 # Try to parse JSON response for additional info
                 try:
                     data = response.json()
                     self.logger.debug(f"Response from {endpoint}: {data}")
-                    return True, data
-                except:
-                    self.logger.debug(f"Non-JSON response from {endpoint}: {response.text[:100]}")
-                    return True, response.text[:100]
+                except ValueError:
+                    data = response.text[:100]
+                    self.logger.debug(f"Non-JSON response from {endpoint}: {data}")
+                self.body_hashes[endpoint] = digest
+                self.responses[endpoint] = data
+                changed = previous is None or comparable(data) != comparable(previous)
+                return True, data, changed, previous
             else:
-                self.stats['failed_requests'] += 1
-                self.stats['last_failure'] = datetime.now()
+                self.record_result(endpoint, False, elapsed)
                 self.logger.warning(f"HTTP {response.status_code} from {endpoint}")
-                return False, f"HTTP {response.status_code}"
+                return False, f"HTTP {response.status_code}", False, previous
                 
         except requests.exceptions.Timeout:
-            self.stats['failed_requests'] += 1
-            self.stats['last_failure'] = datetime.now()
+            # A timeout is the slow tail this histogram is for
+            self.record_result(endpoint, False, time.perf_counter() - started)
             self.logger.error(f"Timeout pinging {endpoint}")
-            return False, "Timeout"
+            return False, "Timeout", False, previous
             
         except requests.exceptions.ConnectionError:
-            self.stats['failed_requests'] += 1
-            self.stats['last_failure'] = datetime.now()
+            self.record_result(endpoint, False)
             self.logger.error(f"Connection error pinging {endpoint}")
-            return False, "Connection Error"
+            return False, "Connection Error", False, previous
             
         except Exception as e:
-            self.stats['failed_requests'] += 1
-            self.stats['last_failure'] = datetime.now()
+            self.record_result(endpoint, False)
             self.logger.error(f"Unexpected error pinging {endpoint}: {e}")
-            return False, str(e)
+            return False, str(e), False, previous
     
     def ping_all_endpoints(self):
-        """Ping all configured endpoints"""
+        """Ping all configured endpoints concurrently, each against its own deadline"""
+        return self.ping_endpoints(self.config['endpoints'])
+
+    def ping_endpoints(self, endpoints):
+        """Ping the given endpoints concurrently, each against its own deadline"""
+        started = time.monotonic()
+        futures = {endpoint: self.executor.submit(self.ping_endpoint, endpoint)
+                   for endpoint in endpoints}
         results = {}
         
-        for endpoint in self.config['endpoints']:
-            success, data = self.ping_endpoint(endpoint)
+        for endpoint, future in futures.items():
+            # requests' timeout is per socket read, so a trickling response is cut off here
+            remaining = started + self.endpoint_timeout(endpoint) - time.monotonic()
+            try:
+                success, data, changed, previous = future.result(timeout=max(remaining, 0) + 0.5)
+            except FutureTimeout:
+                success, data, changed, previous = False, "Deadline exceeded", False, None
             results[endpoint] = {
                 'success': success,
                 'data': data,
+                'changed': changed,
+                'previous': previous,
                 'timestamp': datetime.now().isoformat()
             }
         
+        self.notify_changes(results)
         return results
     
+    def schedule(self, endpoint):
+        if endpoint not in self.schedules:
+            self.schedules[endpoint] = EndpointSchedule(endpoint)
+        return self.schedules[endpoint]
+
+    def due_endpoints(self, now):
+        """Endpoints whose next ping is due (moving open breakers to half-open)"""
+        return [endpoint for endpoint in self.config['endpoints'] if self.schedule(endpoint).due(now)]
+
+    def success_interval(self, schedule, now):
+        """Seconds to the next ping of a healthy endpoint: fast around an expected draw change"""
+        interval = self.config['ping_interval']
+        expected = self.draw_clock.expected_change()
+        if not schedule.reports_draw or expected is None:
+            return interval
+
+        fast_interval = self.config.get('fast_interval', 2)
+        fast_window = self.config.get('fast_window', 10)
+        if expected - fast_window <= now <= expected + fast_window:
+            return fast_interval
+        if now < expected - fast_window:
+            # Sleep until the fast window opens rather than overshooting the change
+            return max(fast_interval, min(interval, expected - fast_window - now))
+        return interval  # Prediction missed; wait for the next change to re-learn it
+
+    def update_schedules(self, results, now):
+        """Feed ping results to the draw clock and breakers, logging breaker transitions"""
+        for endpoint, result in results.items():
+            data = result['data'] if result['success'] else None
+            draw_number = draw_number_from(data)
+            if draw_number is not None:
+                schedule = self.schedule(endpoint)
+                schedule.reports_draw = True
+                countdown = data.get('data', {}).get('countdown') if isinstance(data.get('data'), dict) else None
+                if self.draw_clock.observe(draw_number, countdown, now):
+                    self.logger.info(f"🎯 Draw changed to {draw_number} (seen on {endpoint})")
+
+        for endpoint, result in results.items():
+            schedule = self.schedule(endpoint)
+            previous = schedule.state
+            state = schedule.record(result['success'], self.success_interval(schedule, now), self.config, now)
+            if state != previous:
+                if state == 'open':
+                    self.logger.warning(f"⛔ Circuit open for {endpoint} after {schedule.failures} failures, "
+                                        f"retrying in {schedule.next_due - now:.0f}s")
+                elif state == 'closed':
+                    self.logger.info(f"✅ Circuit closed for {endpoint}")
+
+    def seconds_until_next_ping(self, now):
+        if not self.schedules:
+            return self.config['ping_interval']  # Nothing to ping; check the config again later
+        next_due = min((self.schedule(endpoint).next_due for endpoint in self.config['endpoints']),
+                       default=now + self.config['ping_interval'])
+        return max(0.1, next_due - now)
+
+    def save_latency(self, force=False):
+        """Persist the latency histograms so the rolling window survives a restart
+
+        Only once per histogram window (when the ring moves to a new slot)
+        unless forced, so fast probing does not rewrite the file every ping.
+        """
+        window = int(time.time() // HISTOGRAM_WINDOW_SECONDS)
+        if window == self.saved_window and not force:
+            return
+        self.saved_window = window
+        with self.stats_lock:
+            try:
+                save_histograms(self.config.get('histogram_file', HISTOGRAM_FILE), self.latency)
+            except OSError as e:
+                self.logger.warning(f"Could not save latency histograms: {e}")
+
     def get_system_status(self):
         """Get overall system status"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+            latency = {endpoint: histogram.percentiles() for endpoint, histogram in self.latency.items()}
+        expected = self.draw_clock.expected_change()
         uptime = datetime.now() - self.start_time
-        success_rate = (self.stats['successful_requests'] / max(self.stats['total_requests'], 1)) * 100
+        success_rate = (stats['successful_requests'] / max(stats['total_requests'], 1)) * 100
         
         return {
             'uptime_seconds': int(uptime.total_seconds()),
             'uptime_formatted': str(uptime),
-            'total_requests': self.stats['total_requests'],
-            'successful_requests': self.stats['successful_requests'],
-            'failed_requests': self.stats['failed_requests'],
+            'total_requests': stats['total_requests'],
+            'successful_requests': stats['successful_requests'],
+            'failed_requests': stats['failed_requests'],
             'success_rate': round(success_rate, 2),
-            'last_success': self.stats['last_success'].isoformat() if self.stats['last_success'] else None,
-            'last_failure': self.stats['last_failure'].isoformat() if self.stats['last_failure'] else None
+            'last_success': stats['last_success'].isoformat() if stats['last_success'] else None,
+            'last_failure': stats['last_failure'].isoformat() if stats['last_failure'] else None,
+            'latency_ms': latency,
+            'circuits': {endpoint: {'state': schedule.state, 'failures': schedule.failures,
+                                    'next_ping_in': round(max(0, schedule.next_due - time.time()), 1)}
+                         for endpoint, schedule in list(self.schedules.items())},
+            'next_draw_expected_in': round(expected - time.time(), 1) if expected else None
         }
     
     def run(self):
@@ -166,29 +851,36 @@ class TVKeepAlive:
         
         while self.running:
             try:
-                # Ping all endpoints
-                results = self.ping_all_endpoints()
-                
-                # Log summary
-                successful_endpoints = sum(1 for r in results.values() if r['success'])
-                total_endpoints = len(results)
-                
-                self.logger.info(f"Ping cycle complete: {successful_endpoints}/{total_endpoints} endpoints successful")
-                
-                # Log detailed results at debug level
-                for endpoint, result in results.items():
-                    if result['success']:
-                        self.logger.debug(f"✅ {endpoint}: OK")
-                    else:
-                        self.logger.warning(f"❌ {endpoint}: {result['data']}")
+                self.reload_config()
+
+                # Ping the endpoints that are due
+                due = self.due_endpoints(time.time())
+                if due:
+                    results = self.ping_endpoints(due)
+                    self.update_schedules(results, time.time())
+                    self.save_latency()
+
+                    # Log summary; fast draw probes between full cycles only at debug level
+                    successful_endpoints = sum(1 for r in results.values() if r['success'])
+                    level = logging.INFO if len(due) == len(self.config['endpoints']) else logging.DEBUG
+                    self.logger.log(level, f"Ping cycle complete: {successful_endpoints}/{len(results)} "
+                                           f"endpoints successful")
+
+                    # Log detailed results at debug level
+                    for endpoint, result in results.items():
+                        if result['success']:
+                            self.logger.debug(f"✅ {endpoint}: OK")
+                        else:
+                            self.logger.warning(f"❌ {endpoint}: {result['data']}")
                 
                 # Log system status periodically
-                if self.stats['total_requests'] % 10 == 0:  # Every 10 cycles
+                if time.time() - self.last_status_log >= self.config.get('status_interval', 300):
+                    self.last_status_log = time.time()
                     status = self.get_system_status()
                     self.logger.info(f"System status: {status}")
                 
-                # Wait before next cycle
-                time.sleep(self.config['ping_interval'])
+                # Wait until the next endpoint is due
+                time.sleep(self.seconds_until_next_ping(time.time()))
                 
             except KeyboardInterrupt:
                 self.logger.info("Received keyboard interrupt")
@@ -207,13 +899,17 @@ class TVKeepAlive:
         # Log final statistics
         final_status = self.get_system_status()
         self.logger.info(f"Final statistics: {final_status}")
+        self.save_latency(force=True)
+
+        self.executor.shutdown(wait=False)
+        self.session.close()
 
 def main():
     """Main entry point"""
     config = {
         'base_url': 'http://localhost/slipp/',
         'endpoints': [
-            'api/get_next_draw_number.php',
+            'php/get_next_draw_number.php',
             'api/safe_draw_advance.php?action=info',
             'api/tv_sync.php',
             'php/get_draw_history.php',
@@ -221,10 +917,35 @@ def main():
         ],
         'ping_interval': 30,  # Ping every 30 seconds
         'timeout': 10,  # Request timeout
+        'endpoint_timeouts': {},  # Per-endpoint deadlines, e.g. {'php/get_draw_history.php': 20}
+        'max_concurrency': 8,  # Endpoints pinged at once
+        'histogram_file': HISTOGRAM_FILE,  # Latency histograms, kept across restarts
+        'failure_threshold': 3,  # Consecutive failures before an endpoint's circuit opens
+        'max_backoff': 300,  # Longest wait between retries of a failing endpoint
+        'fast_interval': 2,  # Draw endpoints' ping interval around an expected draw change...
+        'fast_window': 10,  # ...from this many seconds before it until this many after
+        'status_interval': 300,  # Seconds between system status log lines
+        'load_mix': LOAD_MIX,  # --load: requests per second per virtual TV / cashier
+        'load_workers': 64,  # --load: requests in flight at once
         'log_level': logging.INFO
     }
-    
-    keepalive = TVKeepAlive(config)
+
+    parser = argparse.ArgumentParser(description='Keep the TV display backend active, or load test it')
+    parser.add_argument('--load', action='store_true', help='Generate load from virtual TVs and cashiers')
+    parser.add_argument('--tvs', type=int, default=10, help='Virtual TV displays (--load)')
+    parser.add_argument('--cashiers', type=int, default=10, help='Virtual cashiers (--load)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of load (--load)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every request rate in the mix (--load)')
+    parser.add_argument('--stub', action='store_true', help='Run against the bundled stub backend (--load)')
+    parser.add_argument('--stub-latency-ms', type=float, default=0, help="Stub backend's delay per request")
+    parser.add_argument('--output', help='Write the load report to this JSON file')
+    args = parser.parse_args()
+
+    # The "keepalive" section of headless_tv_config.json overrides these, also while running
+    watcher = ConfigWatcher(config, CONFIG_FILE, section='keepalive')
+    if args.load:
+        sys.exit(run_load(watcher.config, args))
+    keepalive = TVKeepAlive(watcher.config, watcher)
     
     try:
         keepalive.run()
@@ -232,5 +953,28 @@ def main():
         logging.error(f"Fatal error: {e}")
         sys.exit(1)
 
+def run_load(config, args):
+    """Run LoadGenerator from the command line; returns the exit code"""
+    logging.basicConfig(level=config['log_level'], format='%(asctime)s - %(levelname)s - %(message)s')
+    backend = None
+    if args.stub:
+        from tv_stub_server import StubBackend
+        backend = StubBackend(port=0, latency_ms=args.stub_latency_ms).start()
+        backend.start_draws()
+        config = dict(config, base_url=backend.base_url)
+
+    try:
+        generator = LoadGenerator(config, {'tv': args.tvs, 'cashier': args.cashiers}, args.duration, args.scale)
+        report = generator.run()
+    finally:
+        if backend:
+            backend.stop()
+
+    generator.log_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['totals']['ok'] else 1
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+TV Display Configuration
+
+headless_tv_display.py and simple_tv_keepalive.py both read
+headless_tv_config.json (written by setup_headless_tv.py) over their
+built-in defaults. The file's modification time is checked between
+monitoring cycles, so edits to intervals and policies apply to the running
+process without relaunching Chrome.
+
+The keep-alive reads the file's "keepalive" section; the monitor reads the
+rest. A file that is missing or mid-write (invalid JSON) leaves the current
+settings in place.
+"""
+
+import os
+import copy
+import json
+import logging
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'headless_tv_config.json')
+CONFIG_POLL_INTERVAL = 5  # Seconds between modification time checks while idle
+
+
+def merge_config(defaults, overrides):
+    """Copy of defaults with overrides applied; nested dicts merge, everything else replaces"""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def normalize_config(config):
+    """Convert JSON spellings to what the scripts expect ("INFO" -> logging.INFO, [w, h] -> (w, h))"""
+    level = config.get('log_level')
+    if isinstance(level, str):
+        resolved = logging.getLevelName(level.upper())
+        config['log_level'] = resolved if isinstance(resolved, int) else logging.INFO
+    if isinstance(config.get('window_size'), list):
+        config['window_size'] = tuple(config['window_size'])
+    return config
+
+
+class ConfigWatcher:
+    """Load a JSON config over defaults and notice when the file changes"""
+
+    def __init__(self, defaults, path=CONFIG_FILE, section=None, exclude=(), overrides=None, logger=None):
+        self.defaults = defaults
+        self.path = path
+        self.section = section
+        self.exclude = exclude  # Sections that belong to another script
+        self.overrides = overrides or {}  # Command-line settings win over the file, also after reloads
+        self.logger = logger or logging.getLogger(__name__)
+        self.mtime = self.stat()
+        self.config = self.build(self.read() if self.mtime is not None else {})
+
+    def stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def read(self):
+        """Settings from the file (or its section); None when it cannot be read or parsed"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read {self.path}, keeping current settings: {e}")
+            return None
+        if not isinstance(data, dict):
+            return {}
+        if self.section:
+            data = data.get(self.section, {})
+        return {key: value for key, value in data.items() if key not in self.exclude} \
+            if isinstance(data, dict) else {}
+
+    def build(self, data):
+        return normalize_config(merge_config(merge_config(self.defaults, data or {}), self.overrides))
+
+    def changed(self):
+        """True when the file was written (or removed) since the last load"""
+        return self.stat() != self.mtime
+
+    def poll(self):
+        """The new config when the file changed and parses, else None"""
+        mtime = self.stat()
+        if mtime == self.mtime:
+            return None
+
+        # Remember this version even when it does not parse: the next save changes mtime again
+        self.mtime = mtime
+        data = self.read() if mtime is not None else {}
+        if data is None:
+            return None
+
+        config = self.build(data)
+        if config == self.config:
+            return None
+        self.config = config
+        return config
+
+
+def changed_keys(old, new):
+    """Top-level keys whose values differ between two configs"""
+    return sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
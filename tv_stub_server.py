@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+TV Display Stub Backend
+
+A local stand-in for the PHP endpoints the TV display tools talk to, so
+headless_tv_display.py and simple_tv_keepalive.py can be exercised without
+XAMPP or MySQL. Draws live in memory; saving a result through
+api/save_draw_result.php or php/save_winning_number.php advances the
+current draw exactly like the real endpoints, and draw_time is recorded
+with microseconds.
+
+Served under /slipp/:
+    tvdisplay/index.html                 minimal TV page polling api/tv_sync.php
+    api/tv_sync.php                      current/next draw
+    php/get_next_draw_number.php         current/next draw
+    api/safe_draw_advance.php?action=info
+    api/cashier_draw_sync.php            last completed / next draw for the cashier
+    php/get_draw_history.php             recent, current and upcoming draws
+    php/get_draw_history.php?from=N&to=M stored draws with draw_time
+    api/save_draw_result.php (POST form), php/save_winning_number.php (POST JSON)
+
+Any other path is a 404, so a client polling a wrong endpoint fails here too.
+
+Usage:
+    python tv_stub_server.py --port 8799 --auto-draw 10
+"""
+
+import sys
+import json
+import time
+import hashlib
+import random
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+RED_NUMBERS = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
+
+# Just enough of tvdisplay/index.html for the monitor: the objects its
+# system validation looks for, and currentDrawNumber/rolledNumbersArray
+# kept current by polling tv_sync like DrawSync does
+STUB_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Roulette TV Display (stub)</title></head>
+<body>
+<h1>Draw <span id="draw">-</span></h1>
+<script>
+    window.currentDrawNumber = 0;
+    window.rolledNumbersArray = [];
+    window.DataPersistence = { state: { isLoading: true, isLoaded: false, lastLoadTime: null } };
+    window.DrawNumberManager = {};
+    window.DrawSync = { getCurrentDraw: function () { return window.currentDrawNumber; } };
+    window.TabVisibilityManager = {
+        isVisible: function () { return document.visibilityState === 'visible'; },
+        isCatchUpInProgress: function () { return false; }
+    };
+
+    var pollMs = Number(new URLSearchParams(location.search).get('poll')) || %(poll_ms)d;
+
+    function sync() {
+        fetch('../api/tv_sync.php', { cache: 'no-store' })
+            .then(function (response) { return response.json(); })
+            .then(function (body) {
+                var draw = body.data.current_draw;
+                if (draw !== window.currentDrawNumber) {
+                    window.rolledNumbersArray = body.data.recent_numbers || [];
+                    window.currentDrawNumber = draw;
+                    document.getElementById('draw').textContent = draw;
+                    document.dispatchEvent(new CustomEvent('drawSync:updated'));
+                }
+                var state = window.DataPersistence.state;
+                state.isLoading = false;
+                state.isLoaded = true;
+                state.lastLoadTime = Date.now();
+            })
+            .catch(function () {})
+            .then(function () { setTimeout(sync, pollMs); });
+    }
+    sync();
+</script>
+</body>
+</html>
+"""
+
+
+class StubState:
+    """In-memory draws shared by all request threads"""
+
+    def __init__(self, first_draw=1):
+        self.lock = threading.Lock()
+        self.current_draw = first_draw - 1
+        self.draws = {}
+
+    def save(self, draw_number, winning_number, winning_color=None, source='stub'):
+        winning_color = winning_color or color_of(winning_number)
+        with self.lock:
+            if draw_number in self.draws:
+                return self.draws[draw_number], True
+            row = {
+                'draw_id': f"DRAW-{datetime.now():%Y%m%d}-{draw_number}",
+                'draw_number': draw_number,
+                'winning_number': winning_number,
+                'winning_color': winning_color,
+                'notes': f"Saved by {source}",
+                'draw_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+            }
+            self.draws[draw_number] = row
+            self.current_draw = max(self.current_draw, draw_number)
+            return row, False
+
+    def recent_numbers(self, count=20):
+        with self.lock:
+            numbers = [self.draws[n]['winning_number'] for n in sorted(self.draws)[-count:]]
+        return numbers[::-1]
+
+
+def color_of(number):
+    if number == 0:
+        return 'green'
+    return 'red' if number in RED_NUMBERS else 'black'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = 'TVStubBackend/1.0'
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like Apache; every response has a Content-Length
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't wait on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass  # Quiet: load tests make thousands of requests
+
+    def send_json(self, body, status=200):
+        payload = json.dumps(body).encode('utf-8')
+        etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+        if status == 200 and self.server.etags and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.etags:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def route(self):
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(self.server.prefix):
+            return None, {}
+        return parts.path[len(self.server.prefix):], {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+    def delay(self):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+    def do_GET(self):
+        state = self.server.state
+        path, query = self.route()
+        self.delay()
+
+        if path is None:
+            self.send_json({'status': 'error', 'message': 'Not found'}, 404)
+        elif path == 'tvdisplay/index.html' or path.startswith('tvdisplay/'):
+            payload = (STUB_PAGE % {'poll_ms': self.server.page_poll_ms}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        elif path == 'api/tv_sync.php':
+            self.send_json({
+                'status': 'success',
+                'data': {
+                    'current_draw': state.current_draw,
+                    'next_draw': state.current_draw + 1,
+                    'is_automatic': True,
+                    'countdown': self.server.countdown(),
+                    'has_forced_number': False,
+                    'forced_number': None,
+                    'recent_numbers': state.recent_numbers()
+                },
+                'timestamp': int(time.time())
+            })
+        elif path == 'php/get_next_draw_number.php':
+            self.send_json({
+                'status': 'success',
+                'current_draw_number': state.current_draw,
+                'next_draw_number': state.current_draw + 1,
+                'source': 'stub',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+        elif path == 'api/safe_draw_advance.php':
+            self.send_json({'success': True, 'currentDraw': state.current_draw, 'nextDraw': state.current_draw + 1})
+        elif path == 'php/get_draw_history.php' and 'from' in query and 'to' in query:
+            start = max(1, int(query['from']))
+            end = min(int(query['to']), start + 999)
+            with state.lock:
+                draws = [state.draws[n] for n in range(start, end + 1) if n in state.draws]
+            self.send_json({'status': 'success', 'current_draw': state.current_draw,
+                            'from': start, 'to': end, 'draws': draws})
+        elif path == 'php/get_draw_history.php':
+            current = state.current_draw
+            history = [{'draw_number': n, 'type': 'recent' if n < current else 'current' if n == current
+                        else 'upcoming', 'has_bets': False, 'total_bets': 0, 'total_stake': 0}
+                       for n in range(max(1, current - 10), current + 11)]
+            self.send_json({'status': 'success', 'current_draw': current, 'draw_history': history})
+        elif path == 'api/cashier_draw_sync.php':
+            with state.lock:
+                last_time = state.draws[state.current_draw]['draw_time'] if state.current_draw in state.draws else None
+                total = len(state.draws)
+            self.send_json({
+                'status': 'success',
+                'data': {
+                    'last_completed_draw': state.current_draw,
+                    'next_draw_for_betting': state.current_draw + 1,
+                    'upcoming_draw': state.current_draw + 1,
+                    'current_completed_draw': state.current_draw,
+                    'system_status': {'total_completed_draws': total, 'last_draw_time': last_time,
+                                      'system_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                },
+                'message': 'Draw information retrieved successfully',
+                'timestamp': int(time.time())
+            })
+        else:
+            self.send_json({'status': 'error', 'message': 'Not found'}, 404)
+
+    def do_POST(self):
+        state = self.server.state
+        path, _ = self.route()
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        self.delay()
+
+        if path == 'api/save_draw_result.php':
+            data = {key: values[-1] for key, values in parse_qs(body).items()}
+        elif path == 'php/save_winning_number.php':
+            try:
+                data = json.loads(body or '{}')
+            except ValueError:
+                self.send_json({'status': 'error', 'message': 'Invalid JSON data'}, 400)
+                return
+        else:
+            self.send_json({'status': 'error', 'message': 'Not found'}, 404)
+            return
+
+        if 'draw_number' not in data or 'winning_number' not in data:
+            self.send_json({'status': 'error', 'message': 'Missing required parameters'}, 400)
+            return
+
+        row, duplicate = state.save(int(data['draw_number']), int(data['winning_number']),
+                                    data.get('winning_color'), data.get('source', 'stub'))
+        self.send_json({
+            'status': 'success',
+            'message': 'Draw result saved successfully',
+            'data': dict(row, next_draw_number=row['draw_number'] + 1, duplicate=duplicate)
+        })
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog for load tests' connection bursts
+
+    def handle_error(self, request, client_address):
+        # Clients that give up at their deadline are expected, not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubBackend:
+    """Run the stub endpoints on a local port in a background thread"""
+
+    def __init__(self, port=8799, host='127.0.0.1', prefix='/slipp/', latency_ms=0,
+                 page_poll_ms=1000, draw_interval=60, first_draw=1, etags=False):
+        self.server = StubServer((host, port), StubHandler)
+        self.server.prefix = prefix
+        self.server.etags = etags  # Send ETags and answer If-None-Match with 304; the PHP endpoints don't
+        self.server.latency_ms = latency_ms
+        self.server.page_poll_ms = page_poll_ms
+        self.server.state = StubState(first_draw)
+        self.server.state.save(first_draw, random.randint(0, 36))  # The page needs a draw to be ready
+        self.server.countdown = self.countdown
+        self.draw_interval = draw_interval
+        self.last_draw_at = time.time()
+        self.thread = None
+        self.draw_thread = None
+        self.running = False
+
+        host, port = self.server.server_address[:2]
+        self.base_url = f"http://{host}:{port}{prefix}"
+        self.page_url = f"{self.base_url}tvdisplay/index.html"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def countdown(self):
+        return max(0, int(self.draw_interval - (time.time() - self.last_draw_at)))
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='tv-stub-backend', daemon=True)
+        self.thread.start()
+        return self
+
+    def save_next_draw(self, session=None):
+        """Save a random result for the next draw through the HTTP endpoint, like the TV does
+
+        Returns (draw number, unix time the save was acknowledged).
+        """
+        draw_number = self.state.current_draw + 1
+        winning_number = random.randint(0, 36)
+        response = (session or requests).post(f"{self.base_url}api/save_draw_result.php", data={
+            'draw_number': draw_number,
+            'winning_number': winning_number,
+            'winning_color': color_of(winning_number),
+            'source': 'tv_stub_server'
+        }, timeout=10)
+        saved_at = time.time()
+        response.raise_for_status()
+        self.last_draw_at = saved_at
+        return draw_number, saved_at
+
+    def start_draws(self, interval=None, on_saved=None):
+        """Save a new draw every interval seconds; on_saved(draw, saved_at) after each"""
+        interval = interval or self.draw_interval
+        self.draw_interval = interval
+
+        def run():
+            session = requests.Session()
+            while self.running:
+                time.sleep(interval)
+                if not self.running:
+                    break
+                try:
+                    draw_number, saved_at = self.save_next_draw(session)
+                except requests.RequestException:
+                    continue
+                if on_saved:
+                    on_saved(draw_number, saved_at)
+
+        self.draw_thread = threading.Thread(target=run, name='tv-stub-draws', daemon=True)
+        self.draw_thread.start()
+
+    def stop(self):
+        self.running = False
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve stub TV display endpoints for local testing')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Artificial delay per request')
+    parser.add_argument('--page-poll-ms', type=int, default=1000, help="Stub TV page's tv_sync poll interval")
+    parser.add_argument('--etags', action='store_true', help='Send ETags and honour If-None-Match')
+    parser.add_argument('--auto-draw', type=float, default=0, metavar='SECONDS',
+                        help='Save a random draw result every SECONDS')
+    args = parser.parse_args()
+
+    backend = StubBackend(args.port, args.host, latency_ms=args.latency_ms, page_poll_ms=args.page_poll_ms,
+                          etags=args.etags)
+    backend.start()
+    print(f"Stub backend at {backend.base_url} (TV page: {backend.page_url})")
+    if args.auto_draw:
+        backend.start_draws(args.auto_draw, lambda draw, saved_at: print(f"Saved draw {draw}"))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()